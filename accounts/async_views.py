@@ -0,0 +1,16 @@
+from asgiref.sync import sync_to_async
+from django.shortcuts import render
+
+from core.supabase import get_async_supabase_client
+from .decorator import supabase_auth_required
+from .views import profile_context, profile_page_query
+
+# Async twin of profile_view, routed when served over ASGI (see core/asgi.py).
+
+@supabase_auth_required
+async def profile_view(request):
+    user_id = request.supabase_user.id
+    client  = await get_async_supabase_client()
+
+    page_res = await profile_page_query(client, user_id).execute()
+    return await sync_to_async(render)(request, "profile.html", profile_context(page_res))
@@ -1,10 +1,19 @@
 from django.shortcuts import redirect
 from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 
 def supabase_auth_required(view_func):
+    if iscoroutinefunction(view_func):
+        async def _wrapped_view(request, *args, **kwargs):
+            # Resolving the lazy user may load the session from the database
+            if not await sync_to_async(bool)(getattr(request, 'supabase_user', None)):
+                return redirect('login')
+            return await view_func(request, *args, **kwargs)
+        return markcoroutinefunction(wraps(view_func)(_wrapped_view))
+
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
         if not getattr(request, 'supabase_user', None):
             return redirect('login')  # Ensure you have a URL named 'login'
         return view_func(request, *args, **kwargs)
-    return _wrapped_view
\ No newline at end of file
+    return _wrapped_view
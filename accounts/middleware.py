@@ -1,23 +1,46 @@
-from core.supabase import get_supabase_client
+import logging
+
+from django.utils.functional import SimpleLazyObject
+
+from .session import ACCESS_TOKEN
+
+logger = logging.getLogger(__name__)
+
+
+def get_supabase_user(request):
+    if not hasattr(request, '_cached_supabase_user'):
+        # PyJWT/cryptography load on the first authenticated request only
+        from .tokens import TokenUnverifiable, verify_access_token
+
+        token = request.session.get(ACCESS_TOKEN)
+
+        user = None
+        if token:
+            # Verify the token locally (cached until it expires)
+            try:
+                user = verify_access_token(token)
+            except TokenUnverifiable as e:
+                # Missing key or JWKS/auth outage: anonymous for this
+                # request, but the token is kept for the next one
+                logger.warning("Could not verify access token: %s", e)
+            else:
+                if user is None:
+                    # Token expired or invalid
+                    request.session.pop(ACCESS_TOKEN, None)
+
+        request._cached_supabase_user = user
+    return request._cached_supabase_user
+
 
 class SupabaseAuthMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
-        
+
     def __call__(self, request):
-        supabase = get_supabase_client()
-        token = request.session.get('supabase_access_token')
-        
-        request.supabase_user = None
-        if token:
-            try:
-                # 3. Verify the token with Supabase
-                user_response = supabase.auth.get_user(token)
-                request.supabase_user = user_response.user
-            except Exception:
-                # Token expired or invalid
-                request.session.pop('supabase_access_token', None)
-
-        # 4. Continue to the view
+        # Resolved on first access only (supabase_auth_required, templates),
+        # so public views never touch the token.
+        request.supabase_user = SimpleLazyObject(lambda: get_supabase_user(request))
+
+        # Continue to the view
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
@@ -0,0 +1,99 @@
+import threading
+import time
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import bump_version
+from core.supabase import get_supabase_client
+
+# Only what bylines need; the full row is read by profile/settings views.
+PROFILE_FIELDS = "id, username, avatar_url, avatar_renditions"
+
+# Profiles that do not exist are cached too, so a deleted author is not
+# looked up again on every page.
+MISSING = {}
+
+_lock        = threading.Lock()
+_local_cache = None
+
+
+def _get_local_cache():
+    global _local_cache
+    if _local_cache is None:
+        with _lock:
+            if _local_cache is None:
+                # Other processes cannot clear this tier, so it stays short-lived
+                _local_cache = TTLCache(
+                    maxsize=settings.PROFILE_LOCAL_CACHE_SIZE,
+                    ttl=settings.PROFILE_LOCAL_CACHE_TTL,
+                    timer=time.monotonic,
+                )
+    return _local_cache
+
+
+def _key(user_id):
+    return f"profile:{user_id}"
+
+
+def get_profiles(user_ids):
+    """``{user_id: profile or MISSING}`` for ``user_ids``.
+
+    Looks in the process cache, then the shared cache, and fetches whatever
+    is left in a single ``in_()`` query.
+    """
+    ids   = {str(user_id) for user_id in user_ids if user_id}
+    local = _get_local_cache()
+    found = {}
+
+    with _lock:
+        for user_id in ids:
+            profile = local.get(user_id)
+            if profile is not None:
+                found[user_id] = profile
+
+    missing = ids - found.keys()
+    if missing:
+        shared = cache.get_many([_key(user_id) for user_id in missing])
+        for user_id in missing:
+            if _key(user_id) in shared:
+                found[user_id] = shared[_key(user_id)]
+
+    missing = ids - found.keys()
+    if missing:
+        rows = (
+            get_supabase_client().table("profiles")
+            .select(PROFILE_FIELDS)
+            .in_("id", sorted(missing))
+            .execute()
+        ).data or []
+
+        fetched = {user_id: MISSING for user_id in missing}
+        fetched.update({str(row["id"]): row for row in rows})
+        cache.set_many({_key(user_id): p for user_id, p in fetched.items()}, settings.PROFILE_CACHE_TTL)
+        found.update(fetched)
+
+    with _lock:
+        local.update({user_id: found[user_id] for user_id in ids})
+    return found
+
+
+def attach_authors(rows):
+    """Set ``author_username``/``author_avatar`` on rows with an ``author_id``."""
+    profiles = get_profiles(row.get("author_id") for row in rows)
+    for row in rows:
+        profile = profiles.get(str(row.get("author_id"))) or MISSING
+        row["author_username"] = profile.get("username") or "Unknown"
+        row["author_avatar"]   = profile.get("avatar_url")
+    return rows
+
+
+def invalidate_profile(user_id):
+    """Drop a changed profile; the ``profiles`` namespace keys page ETags."""
+    cache.delete(_key(user_id))
+    # Outside the lock: building the cache takes it too
+    local = _get_local_cache()
+    with _lock:
+        local.pop(str(user_id), None)
+    bump_version("profiles")
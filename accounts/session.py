@@ -0,0 +1,5 @@
+# Session keys are kept short: with signed-cookie sessions (SESSION_MODE)
+# the whole session travels in the cookie on every request.
+USER_ID      = "uid"
+USER_EMAIL   = "em"
+ACCESS_TOKEN = "at"
@@ -1,3 +1,123 @@
-from django.test import TestCase
+import io
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from PIL import Image
+
+from accounts import profiles
+from accounts.middleware import get_supabase_user
+from accounts.session import ACCESS_TOKEN
+from accounts.tokens import TokenUnverifiable, verify_access_token
+from core.images import AVATAR_WIDTHS, upload_image
+
+
+class AvatarUploadTests(SimpleTestCase):
+    """Avatars go through core.uploads.LocalStorage instead of Supabase."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = Path(media.name)
+
+        overrides = override_settings(UPLOAD_STORAGE="local", MEDIA_ROOT=media.name, MEDIA_URL="/media/")
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def avatar(self, size=512, mode="RGBA"):
+        buffer = io.BytesIO()
+        Image.new(mode, (size, size), (10, 120, 200, 128)).save(buffer, "PNG")
+        return SimpleUploadedFile("avatar.png", buffer.getvalue(), "image/png")
+
+    def test_avatar_is_stored_under_the_user_prefix(self):
+        avatar_url, renditions = upload_image(self.avatar(), "avatars/user-1", widths=AVATAR_WIDTHS)
+
+        self.assertTrue(avatar_url.startswith("/media/news_bucket/avatars/user-1/"))
+        for fmt in ("webp", "jpeg"):
+            self.assertEqual(set(renditions[fmt]), {str(width) for width in AVATAR_WIDTHS})
+            for width, url in renditions[fmt].items():
+                path = self.media_root / url[len("/media/"):]
+                with Image.open(path) as stored:
+                    self.assertEqual(stored.width, int(width))
+
+    def test_transparent_avatar_gets_a_flat_jpeg(self):
+        _, renditions = upload_image(self.avatar(), "avatars/user-1", widths=AVATAR_WIDTHS)
+
+        path = self.media_root / renditions["jpeg"]["96"][len("/media/"):]
+        with Image.open(path) as stored:
+            self.assertEqual(stored.mode, "RGB")
+
+    def test_each_upload_gets_its_own_key(self):
+        first, _  = upload_image(self.avatar(), "avatars/user-1", widths=AVATAR_WIDTHS)
+        second, _ = upload_image(self.avatar(), "avatars/user-1", widths=AVATAR_WIDTHS)
+
+        self.assertNotEqual(first, second)
+
+
+class InvalidateProfileTests(SimpleTestCase):
+    def setUp(self):
+        # A fresh lock per test, so a hung thread cannot block the next one
+        for name, value in (("_lock", threading.Lock()), ("_local_cache", None)):
+            patcher = mock.patch.object(profiles, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_cold_module_does_not_deadlock(self):
+        # A fresh process whose first request saves a profile: the local
+        # cache is built inside invalidate_profile
+        worker = threading.Thread(target=profiles.invalidate_profile, args=("user-1",), daemon=True)
+        worker.start()
+        worker.join(timeout=5)
+
+        self.assertFalse(worker.is_alive(), "invalidate_profile hung on a cold module")
+        self.assertIsNotNone(profiles._local_cache)
+
+    def test_drops_the_local_copy(self):
+        profiles._get_local_cache()["user-1"] = {"id": "user-1", "username": "old"}
+
+        profiles.invalidate_profile("user-1")
+
+        self.assertNotIn("user-1", profiles._local_cache)
+
+
+def access_token(secret="jwt-secret", **claims):
+    claims = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 3600, **claims}
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+@override_settings(SUPABASE_JWT_SECRET="jwt-secret", SUPABASE_AUTH_REMOTE_FALLBACK=False)
+class AccessTokenTests(SimpleTestCase):
+    def resolve(self, token):
+        request = RequestFactory().get("/")
+        request.session = {ACCESS_TOKEN: token}
+        return get_supabase_user(request), request.session
+
+    def test_valid_token(self):
+        user, session = self.resolve(access_token())
+
+        self.assertEqual(user.id, "user-1")
+        self.assertIn(ACCESS_TOKEN, session)
+
+    def test_invalid_or_expired_token_ends_the_session(self):
+        for token in (access_token(secret="other"), access_token(exp=int(time.time()) - 60)):
+            with self.subTest(token=token):
+                user, session = self.resolve(token)
+
+                self.assertIsNone(user)
+                self.assertNotIn(ACCESS_TOKEN, session)
+
+    @override_settings(SUPABASE_JWT_SECRET=None)
+    def test_missing_secret_is_not_a_verdict(self):
+        token = access_token(sub="user-2")
+        with self.assertRaises(TokenUnverifiable):
+            verify_access_token(token)
+
+        with self.assertLogs("accounts.middleware", "WARNING"):
+            user, session = self.resolve(token)
+        self.assertIsNone(user)
+        self.assertEqual(session[ACCESS_TOKEN], token)
@@ -0,0 +1,152 @@
+import hashlib
+import threading
+import time
+
+import jwt
+from cachetools import TLRUCache
+from django.conf import settings
+
+from core.supabase import get_supabase_client
+
+_lock        = threading.Lock()
+_user_cache  = None
+_jwks_client = None
+
+
+class SupabaseUser:
+    """User built from verified access-token claims (mirrors gotrue's User)."""
+
+    def __init__(self, claims):
+        self.id            = claims.get("sub")
+        self.email         = claims.get("email")
+        self.phone         = claims.get("phone")
+        self.role          = claims.get("role")
+        self.aud           = claims.get("aud")
+        self.app_metadata  = claims.get("app_metadata") or {}
+        self.user_metadata = claims.get("user_metadata") or {}
+        self.exp           = claims.get("exp")
+        self.claims        = claims
+
+    def __bool__(self):
+        return bool(self.id)
+
+    def __repr__(self):
+        return f"<SupabaseUser {self.id}>"
+
+
+class TokenUnverifiable(Exception):
+    """Raised when the token cannot be checked at all (no key, auth unreachable).
+
+    Says nothing about the token itself, so it must not end the session.
+    """
+
+
+def _get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        with _lock:
+            if _user_cache is None:
+                _user_cache = TLRUCache(
+                    maxsize=settings.SUPABASE_AUTH_CACHE_SIZE,
+                    ttu=lambda _key, entry, _now: entry[0],
+                    timer=time.time,
+                )
+    return _user_cache
+
+
+def _get_jwks_client():
+    global _jwks_client
+    if _jwks_client is None:
+        with _lock:
+            if _jwks_client is None:
+                _jwks_client = jwt.PyJWKClient(
+                    settings.SUPABASE_JWKS_URL,
+                    cache_keys=True,
+                    lifespan=settings.SUPABASE_JWKS_LIFESPAN,
+                    headers={"apikey": settings.SUPABASE_KEY or ""},
+                    timeout=settings.SUPABASE_TIMEOUT,
+                )
+    return _jwks_client
+
+
+def _signing_key(token):
+    alg = jwt.get_unverified_header(token).get("alg")
+
+    if alg == "HS256":
+        if not settings.SUPABASE_JWT_SECRET:
+            raise TokenUnverifiable("SUPABASE_JWT_SECRET is not configured")
+        return settings.SUPABASE_JWT_SECRET, alg
+
+    if alg in ("RS256", "ES256", "EdDSA"):
+        try:
+            return _get_jwks_client().get_signing_key_from_jwt(token).key, alg
+        except jwt.PyJWKClientConnectionError as e:
+            raise TokenUnverifiable(str(e)) from e
+
+    raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {alg}")
+
+
+def _decode_locally(token):
+    key, alg = _signing_key(token)
+    claims   = jwt.decode(
+        token,
+        key,
+        algorithms=[alg],
+        audience=settings.SUPABASE_JWT_AUDIENCE,
+        leeway=settings.SUPABASE_JWT_LEEWAY,
+        options={"require": ["exp", "sub"]},
+    )
+    return SupabaseUser(claims), claims["exp"]
+
+
+def _decode_remotely(token):
+    from supabase_auth.errors import AuthApiError
+
+    try:
+        user_response = get_supabase_client().auth.get_user(token)
+    except AuthApiError as e:
+        raise jwt.InvalidTokenError(f"Token rejected by Supabase: {e}") from e
+    except Exception as e:
+        # Network failures and 5xx (AuthRetryableError) are not a verdict
+        raise TokenUnverifiable(str(e)) from e
+    if not user_response or not user_response.user:
+        raise jwt.InvalidTokenError("Token rejected by Supabase")
+
+    claims = jwt.decode(token, options={"verify_signature": False})
+    return user_response.user, claims.get("exp", time.time())
+
+
+def verify_access_token(token):
+    """Return the user for ``token`` or None if it is invalid or expired.
+
+    Tokens are verified locally against SUPABASE_JWT_SECRET (HS256) or the
+    project JWKS (asymmetric keys). The network check via ``auth.get_user``
+    only runs when local verification is impossible and
+    SUPABASE_AUTH_REMOTE_FALLBACK is enabled. Raises TokenUnverifiable
+    when neither can reach a verdict.
+    """
+    if not token:
+        return None
+
+    key   = hashlib.sha256(token.encode()).hexdigest()
+    cache = _get_user_cache()
+    with _lock:
+        entry = cache.get(key)
+    if entry:
+        return entry[1]
+
+    try:
+        user, exp = _decode_locally(token)
+    except TokenUnverifiable:
+        if not settings.SUPABASE_AUTH_REMOTE_FALLBACK:
+            raise
+        try:
+            user, exp = _decode_remotely(token)
+        except jwt.PyJWTError:
+            return None
+    except jwt.PyJWTError:
+        return None
+
+    with _lock:
+        cache[key] = (exp, user)
+    return user
@@ -1,11 +1,15 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import views, async_views
+
+# ASGI serves the async profile view (concurrent Supabase queries)
+profile_view = async_views.profile_view if settings.ASYNC_VIEWS else views.profile_view
 
 urlpatterns = [
     path('login', views.login_view, name='login'),
     path('register', views.register_view, name='register'),
     path("logout", views.logout_view, name="logout"),
-    path("profile", views.profile_view, name="profile"),
+    path("profile", profile_view, name="profile"),
     path("settings", views.settings_view, name="settings"),
 ]
@@ -1,15 +1,21 @@
 from datetime import datetime
 import json
+import logging
 from urllib import request, response
-from django.http import HttpResponse, HttpResponseNotAllowed
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
-from ratelimit import limits, sleep_and_retry
 from .decorator import supabase_auth_required
+from .session import ACCESS_TOKEN, USER_EMAIL, USER_ID
 
-from core.supabase import get_supabase_client
+from core.supabase import get_supabase_client, get_scoped_supabase_client
+from core.images import delete_image, upload_image, AVATAR_WIDTHS
+from core.uploads import get_upload, UploadTooLarge
+from .profiles import invalidate_profile
+
+logger = logging.getLogger(__name__)
 
 class DateTimeEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -40,7 +46,7 @@ def login_view(request):
         password = request.POST.get("password", "")
 
         if validate_auth_input(request, email, password):
-            supabase = get_supabase_client()
+            supabase = get_scoped_supabase_client()
             try:
                 # 1. Auth attempt
                 response = supabase.auth.sign_in_with_password({
@@ -48,29 +54,22 @@ def login_view(request):
                     "password": password
                 })
 
-                print("--- LOGIN SUCCESSFUL ---")
-
-                # 2. Convert to dict (for debug only)
-                user_data = response.user.model_dump()
-                session_data = response.session.model_dump()
-
-                print("USER DATA:", json.dumps(user_data, indent=4, cls=DateTimeEncoder))
-                print("SESSION DATA:", json.dumps(session_data, indent=4, cls=DateTimeEncoder))
+                # 2. Never log the session itself: it holds the tokens
+                logger.info("Login succeeded for user %s", response.user.id)
 
                 # 3. Session Management
                 request.session.cycle_key()
-                request.session['supabase_access_token'] = response.session.access_token
-                request.session['user_email'] = response.user.email
+                request.session[ACCESS_TOKEN] = response.session.access_token
+                request.session[USER_EMAIL] = response.user.email
 
                 # 🔑 IMPORTANT: store Supabase user UUID for News
-                request.session['supabase_user_id'] = response.user.id
+                request.session[USER_ID] = response.user.id
 
                 # 4. Redirect to news list
-                print("Redirecting to news list...")
                 return redirect("news_list")
 
             except Exception as e:
-                print(f"DEBUG Error: {e}")
+                logger.warning("Login failed: %s", e)
 
                 if isinstance(e, TypeError):
                     messages.error(request, "Server logging error, but you might be logged in.")
@@ -86,7 +85,7 @@ def login_view(request):
 # @sleep_and_retry
 # @limits(calls=5, period=900)
 def register_view(request):
-    if request.session.get('supabase_access_token'):
+    if request.session.get(ACCESS_TOKEN):
         return redirect('todos')
 
     if request.method == 'POST':
@@ -95,7 +94,7 @@ def register_view(request):
         password = request.POST.get('password', '')
 
         if validate_auth_input(request, email, password):
-            supabase = get_supabase_client()
+            supabase = get_scoped_supabase_client()
             try:
                 response = supabase.auth.sign_up({
                     "email": email, 
@@ -107,18 +106,11 @@ def register_view(request):
                     }
                 })
                 
-                # --- SAFE DEBUGGING ---
-                print("--- DEBUG START ---")
                 if response.user:
-                    print(f"User Created: {response.user.id}")
-                
-                if response.session:
-                    print("Session active (Auto-login enabled)")
-                    # Safe way to print session if it exists
-                    # print(json.dumps(response.session.model_dump(), indent=4))
-                else:
-                    print("No session: Email verification required.")
-                print("--- DEBUG END ---")
+                    logger.info(
+                        "User created: %s (%s)", response.user.id,
+                        "auto-login" if response.session else "email verification required",
+                    )
 
                 # --- SUCCESS LOGIC ---
                 # Check if confirmation email was sent
@@ -127,12 +119,12 @@ def register_view(request):
                 else:
                     # This triggers if you have "Confirm Email" turned OFF in Supabase settings
                     messages.success(request, 'Account created and logged in successfully!')
-                    request.session['supabase_access_token'] = response.session.access_token
+                    request.session[ACCESS_TOKEN] = response.session.access_token
                 
                 return redirect('login')
 
             except Exception as e:
-                print(f"Registration Error: {e}")
+                logger.warning("Registration failed: %s", e)
                 # Clean error message for user display
                 error_msg = str(e).split(':')[-1].strip() 
                 messages.error(request, error_msg)
@@ -148,28 +140,19 @@ def logout_view(request):
     request.session.flush()
     return redirect("login")
 
-@supabase_auth_required
-def profile_view(request):
-    user_id      = request.session.get("supabase_user_id")
-    client       = get_supabase_client()
-
-    profile_res = client.table("profiles").select("*").eq("id", user_id).single().execute()
-    profile = profile_res.data
+def profile_page_query(client, user_id):
+    """Profile, author stats and recent posts in one RPC (sync or async client)."""
+    return client.rpc("get_profile_page", {"p_user_id": user_id, "p_recent": 5})
 
-    posts_res = client.table("news").select("*", count="exact", head=True).eq("author_id", user_id).execute()
-    posts_count = posts_res.count or 0
-
-    recent_posts_res = (
-        client.table("news")
-        .select("id, title, votes, created_at")
-        .eq("author_id", user_id)
-        .order("created_at", desc=True)
-        .limit(5)
-        .execute()
-    )
+def profile_context(page_res):
+    page    = page_res.data or {}
+    profile = page.get("profile")
+    stats   = page.get("stats") or {}
+    if not profile:
+        raise Http404("Profile not found")
 
     recent_posts = []
-    for post in (recent_posts_res.data or []):
+    for post in (page.get("recent_posts") or []):
         if post.get("created_at"):
             post["created_at"] = datetime.fromisoformat(post["created_at"].replace("Z", "+00:00"))
         recent_posts.append(post)
@@ -177,54 +160,63 @@ def profile_view(request):
     if profile.get("created_at"):
         profile["created_at"] = datetime.fromisoformat(profile["created_at"].replace("Z", "+00:00"))
 
-    return render(request, "profile.html", {
+    return {
         "title": "Profile",
         "profile": profile,
-        "posts_count": posts_count,
+        "posts_count": stats.get("posts_count", 0),
+        "stats": stats,
         "recent_posts": recent_posts,
-    })
+    }
+
+@supabase_auth_required
+def profile_view(request):
+    user_id      = request.supabase_user.id
+    client       = get_supabase_client()
+
+    return render(request, "profile.html", profile_context(profile_page_query(client, user_id).execute()))
 
 
 @supabase_auth_required
 def settings_view(request):
-    user_id      = request.session.get("supabase_user_id")
+    user_id      = request.supabase_user.id
     client       = get_supabase_client()
 
-    profile_res = client.table("profiles").select("*").eq("id", user_id).single().execute()
-    profile = profile_res.data
-
     if request.method == "POST":
         username   = (request.POST.get("username") or "").strip()
         bio        = (request.POST.get("bio") or "").strip()
-        avatar     = request.FILES.get("avatar")
+
+        try:
+            avatar = get_upload(request, "avatar")
+        except UploadTooLarge as e:
+            messages.error(request, f"Avatar upload failed: {str(e)}")
+            return redirect("settings")
 
         if not username:
             messages.error(request, "Username is required")
             return redirect("settings")
 
-        avatar_url = profile.get("avatar_url")
+        # Only send the avatar columns when they change; the current profile
+        # is only read when the avatar is replaced, to delete the old files
+        changes  = {"username": username, "bio": bio}
+        previous = None
         if avatar:
-            file_ext  = avatar.name.rsplit(".", 1)[-1].lower()
-            file_name = f"avatars/{user_id}.{file_ext}"
             try:
-                client.storage.from_("news_bucket").upload(
-                    file_name,
-                    avatar.read(),
-                    {"content-type": avatar.content_type, "upsert": "true"},
+                previous = (
+                    client.table("profiles").select("avatar_renditions").eq("id", user_id)
+                    .maybe_single().execute()
+                )
+                changes["avatar_url"], changes["avatar_renditions"] = upload_image(
+                    avatar, f"avatars/{user_id}", widths=AVATAR_WIDTHS
                 )
-                avatar_url = client.storage.from_("news_bucket").get_public_url(file_name)
             except Exception as e:
                 messages.error(request, f"Avatar upload failed: {str(e)}")
                 return redirect("settings")
 
         try:
-            client.table("profiles").update({
-                "username":   username,
-                "bio":        bio,
-                "avatar_url": avatar_url,
-            }).eq("id", user_id).execute()
-
-            request.session["supabase_username"] = username
+            client.table("profiles").update(changes).eq("id", user_id).execute()
+            invalidate_profile(user_id)
+            if previous and previous.data:
+                delete_image(previous.data.get("avatar_renditions"))
 
             messages.success(request, "Settings saved successfully")
             return redirect("settings")
@@ -233,6 +225,8 @@ def settings_view(request):
             messages.error(request, f"Update failed: {str(e)}")
             return redirect("settings")
 
+    profile = client.table("profiles").select("*").eq("id", user_id).single().execute().data
+
     return render(request, "settings.html", {
         "title": "Settings",
         "profile": profile,
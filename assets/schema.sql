@@ -1,4 +1,6 @@
-create table public.news (
+-- Safe to re-run: every statement is conditional or replaces what it
+-- creates.
+create table if not exists public.news (
   id uuid primary key default gen_random_uuid(),
   author_id uuid not null references auth.users(id) on delete cascade,
   title text not null,
@@ -15,27 +17,402 @@ begin
 end;
 $$ language plpgsql;
 
+drop trigger if exists set_news_updated_at on public.news;
 create trigger set_news_updated_at
-before update on public.news
+before update of title, content, image_url on public.news
 for each row
 execute procedure public.set_updated_at();
 
+drop policy if exists "Public can read news" on public.news;
 create policy "Public can read news"
 on public.news
 for select
 using (true);
 
+drop policy if exists "Users can insert their own news" on public.news;
 create policy "Users can insert their own news"
 on public.news
 for insert
 with check (auth.uid() = author_id);
 
+drop policy if exists "Users can update their own news" on public.news;
 create policy "Users can update their own news"
 on public.news
 for update
 using (auth.uid() = author_id);
 
+drop policy if exists "Users can delete their own news" on public.news;
 create policy "Users can delete their own news"
 on public.news
 for delete
-using (auth.uid() = author_id);
\ No newline at end of file
+using (auth.uid() = author_id);
+
+-- news_detail loads a whole comment thread in one ordered query
+create index if not exists comments_news_thread_idx
+on public.comments (news_id, votes desc, created_at desc);
+
+-- Keyset pagination for /news/api/ (one index per feed filter, id breaks ties;
+-- hot and best are indexed on their stored scores below)
+create index if not exists news_new_idx  on public.news (created_at desc, id desc);
+create index if not exists news_top_idx  on public.news (votes desc, id desc);
+
+-- Feed-card fields derived from the body when a post is written
+-- (news/content.py), so list queries never read or parse the full HTML.
+-- Existing rows: run `manage.py rebuild_news_content` after applying this.
+drop function if exists public.excerpt(public.news);
+alter table public.news
+  add column if not exists excerpt         text,
+  add column if not exists reading_time    int,
+  add column if not exists first_image_url text;
+
+-- Rough preview until rebuild_news_content has re-sanitized every row
+update public.news
+set excerpt = left(regexp_replace(content, '<[^>]*>', '', 'g'), 280)
+where excerpt is null;
+
+-- Batched view counts from news.counters: p_counts maps news id -> views
+create or replace function public.increment_news_views(p_counts jsonb)
+returns void as $$
+  update public.news n
+  set views = n.views + c.value::int
+  from jsonb_each_text(p_counts) c
+  where n.id = c.key::uuid;
+$$ language sql security definer;
+
+-- Server-only (service role): views feed hot_score, so clients must not be
+-- able to add them through /rpc/
+revoke execute on function public.increment_news_views(jsonb) from public, anon, authenticated;
+grant execute on function public.increment_news_views(jsonb) to service_role;
+
+-- Idempotency keys for handle_votes_batch; clients only retry within
+-- seconds, so the prune_vote_requests command drops keys older than a day
+create table if not exists public.vote_requests (
+  user_id uuid not null references auth.users(id) on delete cascade,
+  idempotency_key text not null,
+  created_at timestamptz not null default now(),
+  primary key (user_id, idempotency_key)
+);
+
+create index if not exists vote_requests_created_idx on public.vote_requests (created_at);
+
+-- No policies: only the server (service role) reads or writes keys
+alter table public.vote_requests enable row level security;
+
+-- Batch votes: p_votes is [{target: news|comment, id, value, key}, ...].
+-- A key that was already applied is skipped and reports the current count.
+create or replace function public.handle_votes_batch(p_user_id uuid, p_votes jsonb)
+returns jsonb as $$
+declare
+  v       jsonb;
+  applied boolean;
+  outcome jsonb;
+  results jsonb := '[]'::jsonb;
+begin
+  for v in select * from jsonb_array_elements(p_votes) loop
+    insert into public.vote_requests (user_id, idempotency_key)
+    values (p_user_id, v->>'key')
+    on conflict do nothing;
+    applied := found;
+
+    if v->>'target' = 'news' then
+      if applied then
+        outcome := public.handle_vote(
+          p_news_id => (v->>'id')::uuid, p_user_id => p_user_id, p_value => (v->>'value')::int);
+      else
+        select jsonb_build_object('votes', votes) into outcome
+        from public.news where id = (v->>'id')::uuid;
+      end if;
+    else
+      if applied then
+        outcome := public.handle_comment_vote(
+          p_comment_id => (v->>'id')::uuid, p_user_id => p_user_id, p_value => (v->>'value')::int);
+      else
+        select jsonb_build_object('votes', votes) into outcome
+        from public.comments where id = (v->>'id')::uuid;
+      end if;
+    end if;
+
+    results := results || jsonb_build_object(
+      'target',  v->>'target',
+      'id',      v->>'id',
+      'key',     v->>'key',
+      'applied', applied,
+      'votes',   outcome->'votes'
+    );
+  end loop;
+
+  return results;
+end;
+$$ language plpgsql security definer;
+
+-- p_user_id is trusted, so only the server (SUPABASE_KEY is the service
+-- role key) may call this; PostgREST would otherwise expose it to anyone
+-- holding the anon key
+revoke execute on function public.handle_votes_batch(uuid, jsonb) from public, anon, authenticated;
+grant execute on function public.handle_votes_batch(uuid, jsonb) to service_role;
+
+-- Deletes up to p_limit keys older than p_older_than and returns how many;
+-- run repeatedly (prune_vote_requests command) until it returns less
+create or replace function public.prune_vote_requests(p_older_than interval default '1 day', p_limit int default 10000)
+returns int as $$
+declare
+  deleted int;
+begin
+  delete from public.vote_requests
+  where ctid in (
+    select ctid from public.vote_requests
+    where created_at < now() - p_older_than
+    limit p_limit
+  );
+  get diagnostics deleted = row_count;
+  return deleted;
+end;
+$$ language plpgsql security definer;
+
+revoke execute on function public.prune_vote_requests(interval, int) from public, anon, authenticated;
+grant execute on function public.prune_vote_requests(interval, int) to service_role;
+
+-- Responsive renditions written by core.images: {"webp": {"320": url, ...}, "jpeg": {...}}
+alter table public.news add column if not exists image_renditions jsonb;
+alter table public.profiles add column if not exists avatar_renditions jsonb;
+
+-- Ranking scores for the "hot" and "best" feeds, stored per post so both
+-- are plain index scans.
+--
+-- hot: log-scaled activity plus the post's age in 12.5h units. Anchoring
+-- the time term to created_at makes newer posts outrank older ones with the
+-- same activity without rewriting old rows as the clock moves; a post needs
+-- 10x the activity to beat one published 12.5h later.
+create or replace function public.news_hot_score(p_votes int, p_views int, p_created_at timestamptz)
+returns double precision as $$
+  select sign(p_votes + p_views / 10.0)::float8
+           * log(greatest(abs(p_votes + p_views / 10.0), 1))::float8
+         + extract(epoch from p_created_at - timestamptz '2024-01-01 00:00:00+00') / 45000.0;
+$$ language sql immutable;
+
+-- best: lower bound of the Wilson score interval (95%) for the share of
+-- viewers who upvoted, so a few lucky votes don't beat a long track record.
+create or replace function public.news_best_score(p_votes int, p_views int)
+returns double precision as $$
+  select (p + 1.9208 / n - 1.96 * sqrt(p * (1 - p) / n + 0.9604 / (n * n))) / (1 + 3.8416 / n)
+  from (
+    select greatest(p_votes, 0) / n as p, n
+    from (select greatest(p_views, abs(p_votes), 1)::float8 as n) t
+  ) s;
+$$ language sql immutable;
+
+alter table public.news add column if not exists hot_score double precision not null default 0;
+alter table public.news add column if not exists best_score double precision not null default 0;
+
+-- Recomputed whenever handle_vote or increment_news_views touches a row
+create or replace function public.set_news_scores()
+returns trigger as $$
+begin
+  new.hot_score  := public.news_hot_score(new.votes, new.views, new.created_at);
+  new.best_score := public.news_best_score(new.votes, new.views);
+  return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists set_news_scores on public.news;
+create trigger set_news_scores
+before insert or update of votes, views on public.news
+for each row
+execute procedure public.set_news_scores();
+
+drop index if exists public.news_hot_idx, public.news_best_idx;
+create index if not exists news_hot_idx  on public.news (hot_score desc, id desc);
+create index if not exists news_best_idx on public.news (best_score desc, id desc);
+
+-- Rewrites up to p_limit rows whose stored scores are out of date (backfill
+-- after this migration, or after changing the formulas above). Returns the
+-- number of rows updated; run repeatedly until it returns 0.
+create or replace function public.refresh_news_scores(p_limit int default 1000)
+returns int as $$
+declare
+  updated int;
+begin
+  update public.news n
+  set hot_score  = public.news_hot_score(n.votes, n.views, n.created_at),
+      best_score = public.news_best_score(n.votes, n.views)
+  where n.id in (
+    select id from public.news
+    where hot_score  is distinct from public.news_hot_score(votes, views, created_at)
+       or best_score is distinct from public.news_best_score(votes, views)
+    limit p_limit
+  );
+  get diagnostics updated = row_count;
+  return updated;
+end;
+$$ language plpgsql security definer;
+
+-- Run by the refresh_news_scores command (service role) only
+revoke execute on function public.refresh_news_scores(int) from public, anon, authenticated;
+grant execute on function public.refresh_news_scores(int) to service_role;
+
+-- Full-text search for /news/api/search/: titles weigh more than bodies,
+-- and the GIN index keeps lookups proportional to the matches, not the
+-- archive size
+alter table public.news add column if not exists search_vector tsvector
+generated always as (
+  setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+  setweight(to_tsvector('english', regexp_replace(coalesce(content, ''), '<[^>]*>', ' ', 'g')), 'B')
+) stored;
+
+create index if not exists news_search_idx on public.news using gin (search_vector);
+
+-- Ranked page of matches for a web-style query ("quoted phrases", -exclude,
+-- or). Snippets are only built for the returned page, with <mark> around
+-- matched words.
+create or replace function public.search_news(p_query text, p_limit int default 10, p_offset int default 0)
+returns jsonb as $$
+  with q as (
+    select websearch_to_tsquery('english', p_query) as query
+  ),
+  hits as (
+    select n.id, ts_rank_cd(n.search_vector, q.query) as rank
+    from public.news n, q
+    where n.search_vector @@ q.query
+    order by rank desc, n.created_at desc
+    limit p_limit offset p_offset
+  )
+  select coalesce(jsonb_agg(jsonb_build_object(
+    'id',               n.id,
+    'title',            n.title,
+    'image_url',        n.image_url,
+    'image_renditions', n.image_renditions,
+    'category_id',      n.category_id,
+    'votes',            n.votes,
+    'views',            n.views,
+    'created_at',       n.created_at,
+    'author_id',        n.author_id,
+    'author_username',  coalesce(p.username, 'Unknown'),
+    'rank',             h.rank,
+    'snippet',          ts_headline(
+                          'english', regexp_replace(n.content, '<[^>]*>', ' ', 'g'), q.query,
+                          'StartSel=<mark>, StopSel=</mark>, MinWords=15, MaxWords=35, MaxFragments=2')
+  ) order by h.rank desc, n.created_at desc), '[]'::jsonb)
+  from hits h
+  join public.news n on n.id = h.id
+  left join public.profiles p on p.id = n.author_id
+  cross join q;
+$$ language sql stable;
+
+-- Category feeds (/news/api/?category=...): one index per filter with the
+-- category first, so each category x filter page is a range scan
+create index if not exists news_category_new_idx  on public.news (category_id, created_at desc, id desc);
+create index if not exists news_category_top_idx  on public.news (category_id, votes desc, id desc);
+create index if not exists news_category_hot_idx  on public.news (category_id, hot_score desc, id desc);
+create index if not exists news_category_best_idx on public.news (category_id, best_score desc, id desc);
+
+-- Author stats for the profile page, kept current by triggers instead of
+-- counting on every view
+create table if not exists public.author_stats (
+  author_id uuid primary key references auth.users(id) on delete cascade,
+  posts_count int not null default 0,
+  votes_received int not null default 0,
+  comments_count int not null default 0
+);
+
+-- Readable by anyone (get_profile_page runs as the caller); written only
+-- by the triggers below
+alter table public.author_stats enable row level security;
+
+drop policy if exists "Public can read author stats" on public.author_stats;
+create policy "Public can read author stats"
+on public.author_stats
+for select
+using (true);
+
+create or replace function public.bump_author_stats(p_author_id uuid, p_posts int, p_votes int, p_comments int)
+returns void as $$
+  insert into public.author_stats as s (author_id, posts_count, votes_received, comments_count)
+  values (p_author_id, p_posts, p_votes, p_comments)
+  on conflict (author_id) do update
+  set posts_count    = s.posts_count + excluded.posts_count,
+      votes_received = s.votes_received + excluded.votes_received,
+      comments_count = s.comments_count + excluded.comments_count;
+$$ language sql security definer;
+
+-- Only the triggers (which run as the owner) call this
+revoke execute on function public.bump_author_stats(uuid, int, int, int) from public, anon, authenticated;
+
+create or replace function public.news_author_stats()
+returns trigger as $$
+begin
+  if tg_op = 'INSERT' then
+    perform public.bump_author_stats(new.author_id, 1, new.votes, 0);
+  elsif tg_op = 'DELETE' then
+    perform public.bump_author_stats(old.author_id, -1, -old.votes, 0);
+  elsif new.votes is distinct from old.votes then
+    perform public.bump_author_stats(new.author_id, 0, new.votes - old.votes, 0);
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer;
+
+drop trigger if exists news_author_stats on public.news;
+create trigger news_author_stats
+after insert or delete or update of votes on public.news
+for each row
+execute procedure public.news_author_stats();
+
+create or replace function public.comments_author_stats()
+returns trigger as $$
+begin
+  if tg_op = 'INSERT' then
+    perform public.bump_author_stats(new.author_id, 0, 0, 1);
+  else
+    perform public.bump_author_stats(old.author_id, 0, 0, -1);
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer;
+
+drop trigger if exists comments_author_stats on public.comments;
+create trigger comments_author_stats
+after insert or delete on public.comments
+for each row
+execute procedure public.comments_author_stats();
+
+-- Backfill (safe to re-run: recomputes from the source tables)
+insert into public.author_stats (author_id, posts_count, votes_received, comments_count)
+select a.author_id,
+       coalesce(n.posts, 0),
+       coalesce(n.votes, 0),
+       coalesce(c.comments, 0)
+from (select author_id from public.news union select author_id from public.comments) a
+left join (select author_id, count(*) as posts, sum(votes) as votes from public.news group by author_id) n
+  on n.author_id = a.author_id
+left join (select author_id, count(*) as comments from public.comments group by author_id) c
+  on c.author_id = a.author_id
+on conflict (author_id) do update
+set posts_count    = excluded.posts_count,
+    votes_received = excluded.votes_received,
+    comments_count = excluded.comments_count;
+
+-- Recent posts on the profile page: an index-only scan per author
+create index if not exists news_author_recent_idx
+on public.news (author_id, created_at desc) include (id, title, votes);
+
+-- Everything profile_view renders, in one round trip
+create or replace function public.get_profile_page(p_user_id uuid, p_recent int default 5)
+returns jsonb as $$
+  select jsonb_build_object(
+    'profile', (select to_jsonb(p) from public.profiles p where p.id = p_user_id),
+    'stats', coalesce(
+      (select to_jsonb(s) - 'author_id' from public.author_stats s where s.author_id = p_user_id),
+      '{"posts_count": 0, "votes_received": 0, "comments_count": 0}'::jsonb
+    ),
+    'recent_posts', coalesce((
+      select jsonb_agg(r order by r.created_at desc)
+      from (
+        select id, title, votes, created_at
+        from public.news
+        where author_id = p_user_id
+        order by created_at desc
+        limit p_recent
+      ) r
+    ), '[]'::jsonb)
+  );
+$$ language sql stable;
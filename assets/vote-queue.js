@@ -0,0 +1,77 @@
+// Collects vote clicks for a short window and sends them to
+// /news/api/votes/ in one request. Repeated clicks on the same target are
+// coalesced to the last value; each vote carries an idempotency key that is
+// reused on retry so the server never counts it twice.
+window.VoteQueue = (() => {
+  const ENDPOINT = "/news/api/votes/";
+  const DELAY = 300;
+  const RETRIES = 2;
+
+  const pending = new Map();
+  let timer = null;
+
+  function getCookie(name) {
+    const match = document.cookie.split(";").map(c => c.trim()).find(c => c.startsWith(name + "="));
+    return match ? decodeURIComponent(match.substring(name.length + 1)) : null;
+  }
+
+  function newKey() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+  }
+
+  async function send(votes) {
+    let lastError;
+    for (let attempt = 0; attempt <= RETRIES; attempt++) {
+      try {
+        const res = await fetch(ENDPOINT, {
+          method: "POST",
+          headers: { "X-CSRFToken": getCookie("csrftoken"), "Content-Type": "application/json" },
+          body: JSON.stringify({ votes }),
+        });
+        if (res.ok) return (await res.json()).results || [];
+        if (res.status < 500) throw Object.assign(new Error("Vote rejected"), { final: true });
+        lastError = new Error("API Error");
+      } catch (err) {
+        if (err.final) throw err;
+        lastError = err;
+      }
+      await new Promise(r => setTimeout(r, 250 * 2 ** attempt));
+    }
+    throw lastError;
+  }
+
+  async function flush() {
+    timer = null;
+    const batch = [...pending.values()];
+    pending.clear();
+
+    const votes = batch.map(({ target, id, value, key }) => ({ target, id, value, key }));
+    try {
+      const results = await send(votes);
+      const byKey = new Map(results.map(r => [r.key, r]));
+      batch.forEach(item => {
+        const result = byKey.get(item.key);
+        if (result && !result.error) item.waiters.forEach(w => w.resolve(result));
+        else item.waiters.forEach(w => w.reject(new Error(result ? result.error : "Vote failed")));
+      });
+    } catch (err) {
+      batch.forEach(item => item.waiters.forEach(w => w.reject(err)));
+    }
+  }
+
+  function enqueue(target, id, value) {
+    return new Promise((resolve, reject) => {
+      const slot = `${target}:${id}`;
+      const item = pending.get(slot) || { target, id, waiters: [] };
+      item.value = value;
+      item.key = newKey();
+      item.waiters.push({ resolve, reject });
+      pending.set(slot, item);
+
+      if (!timer) timer = setTimeout(flush, DELAY);
+    });
+  }
+
+  return { enqueue };
+})();
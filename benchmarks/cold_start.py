@@ -0,0 +1,119 @@
+"""
+Measure cold-start cost: import the WSGI app and resolve the URLconf in a
+fresh interpreter, as a serverless instance does on its first request.
+
+    python -m benchmarks.cold_start --runs 10 --top 15
+    python -m benchmarks.cold_start --depth 3    # django.contrib.admin, ...
+
+Reports the median wall time and, from ``python -X importtime``, the
+import time of each package grouped by its first ``--depth`` name parts:
+self time (the group's own module bodies, which add up to the total) and
+cumulative time (its outermost imports, dependencies included). Nested
+imports are attributed to their own group, so deferring one shows up
+under its name rather than inside whatever imported it.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BOOT = (
+    "import core.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def child_env(extra=None):
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:1")
+    env.setdefault("SUPABASE_KEY", "bench.bench.bench")
+    env.setdefault("DJANGO_SECRET_KEY", "bench-secret-key")
+    env.update(extra or {})
+    return env
+
+
+def boot_once(env):
+    start  = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return elapsed, result.stderr
+
+
+def parse_importtime(stderr, depth=1):
+    """``{group: (self us, cumulative us)}`` from -X importtime output.
+
+    A module's group is the first ``depth`` parts of its dotted name.
+    Cumulative time only counts a group's outermost imports, so one nested
+    inside another module of the same group is not counted twice.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # One space after the bar, then two per nesting level
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((level, name.strip(), int(self_us), int(cumulative)))
+
+    totals = defaultdict(lambda: [0, 0])
+    # Modules are printed after their own imports; reversed, each import
+    # follows the one that pulled it in and ``stack`` holds the groups of
+    # its enclosing imports.
+    stack = []
+    for level, name, self_us, cumulative in reversed(entries):
+        del stack[level - 1:]
+        group = ".".join(name.split(".")[:depth])
+        totals[group][0] += self_us
+        if group not in stack:
+            totals[group][1] += cumulative
+        stack.append(group)
+    return {group: tuple(times) for group, times in totals.items()}
+
+
+def run(runs, top, depth=1, extra_env=None):
+    env         = child_env(extra_env)
+    timings     = []
+    self_times  = defaultdict(list)
+    cumulatives = defaultdict(list)
+    for _ in range(runs):
+        elapsed, stderr = boot_once(env)
+        timings.append(elapsed)
+        for name, (self_us, cumulative) in parse_importtime(stderr, depth).items():
+            self_times[name].append(self_us)
+            cumulatives[name].append(cumulative)
+
+    print(f"median boot: {statistics.median(timings) * 1000:.1f} ms over {runs} runs")
+    print(f"  {'self ms':>8}  {'cum ms':>8}  package")
+    ranked = sorted(self_times, key=lambda name: statistics.median(self_times[name]), reverse=True)
+    for name in ranked[:top]:
+        print(f"  {statistics.median(self_times[name]) / 1000:8.1f}  "
+              f"{statistics.median(cumulatives[name]) / 1000:8.1f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--depth", type=int, default=1, help="dotted name parts to group modules by")
+    parser.add_argument("--no-admin", action="store_true", help="boot with DJANGO_ADMIN_ENABLED=False")
+    args = parser.parse_args()
+
+    extra = {"DJANGO_ADMIN_ENABLED": "False"} if args.no_admin else None
+    run(args.runs, args.top, args.depth, extra)
+
+
+if __name__ == "__main__":
+    main()
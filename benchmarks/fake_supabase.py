@@ -0,0 +1,655 @@
+"""
+Local stand-in for the Supabase endpoints used by the app and benchmarks.
+
+Serves from an in-memory dict of tables and understands what the views
+send:
+
+- ``/rest/v1/<table>``: GET/POST/PATCH/DELETE. Supports eq/neq/lt/lte/gt/
+  gte/in/is filters, nested ``or=(...)``/``and(...)`` (keyset cursors),
+  ``order``, ``limit``/``offset``/Range, column selection, ``profiles(...)``
+  embeds and single-object responses.
+- ``/rest/v1/rpc/<fn>``: the vote, view-count, score, search and profile
+  page RPCs from assets/schema.sql.
+- ``/auth/v1/``: password sign-in, sign-up and ``/user``, issuing HS256
+  tokens signed with ``jwt_secret``.
+- ``/storage/v1/object/<bucket>/<key>``: uploads, chunked bodies included.
+
+It counts every TCP connection and request (per endpoint kind), so both
+pooling and backend calls per request can be measured.
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+SCORE_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TAG_RE      = re.compile(r"<[^>]*>")
+INDEXED     = ("id", "news_id", "author_id")
+
+
+def hot_score(votes, views, created_at):
+    """Python twin of public.news_hot_score."""
+    activity = votes + views / 10.0
+    sign     = (activity > 0) - (activity < 0)
+    age      = (datetime.fromisoformat(created_at) - SCORE_EPOCH).total_seconds()
+    return sign * math.log10(max(abs(activity), 1)) + age / 45000.0
+
+
+def best_score(votes, views):
+    """Python twin of public.news_best_score (Wilson lower bound)."""
+    n = float(max(views, abs(votes), 1))
+    p = max(votes, 0) / n
+    return (p + 1.9208 / n - 1.96 * math.sqrt(p * (1 - p) / n + 0.9604 / (n * n))) / (1 + 3.8416 / n)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeSupabaseServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, tables=None, host="127.0.0.1", port=0, jwt_secret="bench-secret", latency=0.0):
+        super().__init__((host, port), FakeSupabaseHandler)
+        self.tables      = defaultdict(list, tables or {})
+        self.jwt_secret  = jwt_secret
+        self.latency     = latency
+        self.objects     = {}
+        self.vote_keys   = set()
+        self.user_votes  = {}
+        self.connections = 0
+        self.requests    = 0
+        self.calls       = Counter()
+        self.data_lock   = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self._indexes    = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def get_request(self):
+        conn = super().get_request()
+        with self._stats_lock:
+            self.connections += 1
+        return conn
+
+    def count(self, kind):
+        with self._stats_lock:
+            self.requests += 1
+            self.calls[kind] += 1
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.connections = 0
+            self.requests    = 0
+            self.calls       = Counter()
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    # --- table access (callers hold data_lock) ---
+
+    def candidates(self, table, params):
+        """Rows that can match ``params``, narrowed by an ``eq`` index."""
+        for key, raw in params:
+            if key in INDEXED and raw.startswith("eq."):
+                index = self._indexes.get((table, key))
+                if index is None:
+                    index = defaultdict(list)
+                    for row in self.tables[table]:
+                        index[str(row.get(key))].append(row)
+                    self._indexes[(table, key)] = index
+                return list(index.get(raw[3:], ()))
+        return list(self.tables[table])
+
+    def changed(self, table):
+        for key in [k for k in self._indexes if k[0] == table]:
+            del self._indexes[key]
+
+    def find(self, table, row_id):
+        rows = self.candidates(table, [("id", f"eq.{row_id}")])
+        return rows[0] if rows else None
+
+
+# --- PostgREST filters -----------------------------------------------------
+
+def _split_top(text):
+    """Split on commas that are not inside parentheses or quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == "," and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [part.strip() for part in parts]
+
+
+def _coerce(row_value, value):
+    if value.startswith('"') and value.endswith('"'):
+        value = value[1:-1].replace('\\"', '"')
+    if isinstance(row_value, bool):
+        return value == "true"
+    if isinstance(row_value, (int, float)):
+        return float(value)
+    return value
+
+
+def _compare(row_value, op, value):
+    negate = op.startswith("not.")
+    if negate:
+        op = op[4:]
+
+    if op == "is":
+        result = row_value is None if value == "null" else row_value == (value == "true")
+    elif row_value is None:
+        result = False
+    elif op == "in":
+        options = [_coerce(row_value, v) for v in _split_top(value.strip("()"))]
+        result  = row_value in options or str(row_value) in options
+    else:
+        target = _coerce(row_value, value)
+        if not isinstance(row_value, (int, float)):
+            row_value = str(row_value)
+        result = {
+            "eq":  lambda: row_value == target,
+            "neq": lambda: row_value != target,
+            "lt":  lambda: row_value < target,
+            "lte": lambda: row_value <= target,
+            "gt":  lambda: row_value > target,
+            "gte": lambda: row_value >= target,
+            "ilike": lambda: target.replace("*", "").lower() in str(row_value).lower(),
+        }.get(op, lambda: True)()
+    return not result if negate else result
+
+
+def _term_matches(row, term):
+    for group in ("and", "or"):
+        if term.startswith(f"{group}(") and term.endswith(")"):
+            terms   = _split_top(term[len(group) + 1:-1])
+            results = (_term_matches(row, t) for t in terms)
+            return all(results) if group == "and" else any(results)
+
+    column, _, rest = term.partition(".")
+    op, _, value    = rest.partition(".")
+    if op == "not":
+        inner_op, _, value = value.partition(".")
+        op = f"not.{inner_op}"
+    return _compare(row.get(column), op, value)
+
+
+def _matches(row, params):
+    for key, raw in params:
+        if key in ("select", "order", "limit", "offset", "on_conflict", "columns"):
+            continue
+        if key in ("or", "and"):
+            if not _term_matches(row, f"{key}{raw}"):
+                return False
+        elif not _term_matches(row, f"{key}.{raw}"):
+            return False
+    return True
+
+
+def _order(rows, order):
+    if not order:
+        return rows
+    for clause in reversed(order.split(",")):
+        column, *modifiers = clause.split(".")
+        desc = "desc" in modifiers
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=desc)
+        rows = present + missing if "nullslast" in modifiers or not desc else missing + present
+    return rows
+
+
+def _project(row, select, tables):
+    columns = _split_top(select or "*")
+    if "*" in columns:
+        out = dict(row)
+    else:
+        out = {}
+
+    for column in columns:
+        if column == "*":
+            continue
+        if "(" in column:
+            name, _, fields = column.partition("(")
+            name = name.split(":")[-1].split("!")[0]
+            if name == "profiles":
+                profile = next((p for p in tables["profiles"] if p["id"] == row.get("author_id")), None)
+                wanted  = _split_top(fields.rstrip(")"))
+                out["profiles"] = (
+                    None if profile is None
+                    else dict(profile) if "*" in wanted
+                    else {f: profile.get(f) for f in wanted}
+                )
+            continue
+        alias, _, source = column.rpartition(":")
+        out[alias or source] = row.get(source)
+    return out
+
+
+# --- RPCs --------------------------------------------------------------------
+
+def _rescore(row):
+    row["hot_score"]  = hot_score(row.get("votes", 0), row.get("views", 0), row["created_at"])
+    row["best_score"] = best_score(row.get("votes", 0), row.get("views", 0))
+
+
+def _vote(server, table, row_id, user_id, value):
+    # One vote per user and row, like handle_vote: the count moves by the
+    # change, and 0 takes the user's vote back
+    row = server.find(table, row_id)
+    if row is None:
+        return {"votes": None}
+    previous = server.user_votes.get((table, row_id, user_id), 0)
+    server.user_votes[(table, row_id, user_id)] = value
+    row["votes"] = row.get("votes", 0) + value - previous
+    if table == "news":
+        _rescore(row)
+    return {"votes": row["votes"]}
+
+
+def rpc_handle_vote(server, args):
+    return _vote(server, "news", args["p_news_id"], args["p_user_id"], args["p_value"])
+
+
+def rpc_handle_comment_vote(server, args):
+    return _vote(server, "comments", args["p_comment_id"], args["p_user_id"], args["p_value"])
+
+
+def rpc_handle_votes_batch(server, args):
+    results = []
+    for vote in args["p_votes"]:
+        key     = (args["p_user_id"], vote["key"])
+        applied = key not in server.vote_keys
+        server.vote_keys.add(key)
+
+        table = "news" if vote["target"] == "news" else "comments"
+        if applied:
+            votes = _vote(server, table, vote["id"], args["p_user_id"], vote["value"])["votes"]
+        else:
+            row   = server.find(table, vote["id"])
+            votes = row["votes"] if row else None
+        results.append({
+            "target": vote["target"], "id": vote["id"], "key": vote["key"],
+            "applied": applied, "votes": votes,
+        })
+    return results
+
+
+def rpc_prune_vote_requests(server, args):
+    # Keys carry no timestamps here; nothing is ever old enough
+    return 0
+
+
+def rpc_increment_news_views(server, args):
+    for news_id, count in args["p_counts"].items():
+        row = server.find("news", news_id)
+        if row is not None:
+            row["views"] = row.get("views", 0) + int(count)
+            _rescore(row)
+    return None
+
+
+def rpc_refresh_news_scores(server, args):
+    return 0
+
+
+def rpc_search_news(server, args):
+    terms = args["p_query"].lower().split()
+    hits  = [
+        row for row in server.tables["news"]
+        if all(t in (row["title"] + " " + row["content"]).lower() for t in terms)
+    ]
+    hits = _order(hits, "created_at.desc")
+    page = hits[args.get("p_offset", 0):args.get("p_offset", 0) + args.get("p_limit", 10)]
+    return [
+        {**_project(row, "id,title,image_url,category_id,votes,views,created_at,author_id", server.tables),
+         "author_username": "bench", "rank": 1.0, "snippet": TAG_RE.sub("", row["content"])[:120]}
+        for row in page
+    ]
+
+
+def rpc_get_profile_page(server, args):
+    user_id  = args["p_user_id"]
+    posts    = [row for row in server.tables["news"] if row["author_id"] == user_id]
+    comments = sum(1 for row in server.tables["comments"] if row["author_id"] == user_id)
+    recent   = _order(posts, "created_at.desc")[:args.get("p_recent", 5)]
+    return {
+        "profile": server.find("profiles", user_id),
+        "stats": {
+            "posts_count":    len(posts),
+            "votes_received": sum(row.get("votes", 0) for row in posts),
+            "comments_count": comments,
+        },
+        "recent_posts": [_project(row, "id,title,votes,created_at", server.tables) for row in recent],
+    }
+
+
+RPCS = {
+    "handle_vote":          rpc_handle_vote,
+    "handle_comment_vote":  rpc_handle_comment_vote,
+    "handle_votes_batch":   rpc_handle_votes_batch,
+    "increment_news_views": rpc_increment_news_views,
+    "refresh_news_scores":  rpc_refresh_news_scores,
+    "prune_vote_requests":  rpc_prune_vote_requests,
+    "search_news":          rpc_search_news,
+    "get_profile_page":     rpc_get_profile_page,
+}
+
+
+# --- HTTP --------------------------------------------------------------------
+
+class FakeSupabaseHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(chunks)
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _json_body(self):
+        raw = self._read_body()
+        return json.loads(raw) if raw else None
+
+    def _route(self, method):
+        url   = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/")]
+        query = parse_qsl(url.query, keep_blank_values=True)
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if parts[:3] == ["rest", "v1", "rpc"] and len(parts) == 4:
+            self.server.count("rpc")
+            return self._rpc(parts[3])
+        if parts[:2] == ["rest", "v1"] and len(parts) == 3:
+            self.server.count("postgrest")
+            return self._rest(method, parts[2], query)
+        if parts[:2] == ["auth", "v1"]:
+            self.server.count("auth")
+            return self._auth(method, parts[2:], dict(query))
+        if parts[:3] == ["storage", "v1", "object"]:
+            self.server.count("storage")
+            return self._storage(method, parts[3:])
+
+        self.server.count("other")
+        return self._send_json({"message": "not found"}, status=404)
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_HEAD(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+    # --- /rest/v1/<table> ---
+
+    def _rest(self, method, table, params):
+        server = self.server
+        body   = self._json_body() if method in ("POST", "PATCH") else None
+        prefer = self.headers.get("Prefer", "")
+
+        with server.data_lock:
+            if method == "POST":
+                rows = body if isinstance(body, list) else [body]
+                for row in rows:
+                    row.setdefault("id", str(uuid.uuid4()))
+                    row.setdefault("created_at", _now())
+                    row.setdefault("updated_at", row["created_at"])
+                    if table in ("news", "comments"):
+                        row.setdefault("votes", 0)
+                    if table == "news":
+                        row.setdefault("views", 0)
+                        _rescore(row)
+                    server.tables[table].append(row)
+                server.changed(table)
+                matched = rows
+            else:
+                matched = [row for row in server.candidates(table, params) if _matches(row, params)]
+                if method == "PATCH":
+                    for row in matched:
+                        row.update(body or {})
+                        row["updated_at"] = _now()
+                    server.changed(table)
+                elif method == "DELETE":
+                    ids = {id(row) for row in matched}
+                    server.tables[table] = [r for r in server.tables[table] if id(r) not in ids]
+                    server.changed(table)
+
+            options = dict(params)
+            rows    = _order(matched, options.get("order"))
+            offset  = int(options.get("offset", 0))
+            limit   = options.get("limit")
+
+            range_header = self.headers.get("Range")
+            if range_header and "-" in range_header:
+                start, _, end = range_header.partition("-")
+                offset, limit = int(start), int(end) - int(start) + 1
+
+            rows = rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+            rows = [_project(row, options.get("select", "*"), server.tables) for row in rows]
+
+        if method != "GET" and "return=representation" not in prefer:
+            return self._send_json(None, status=204 if method != "POST" else 201)
+
+        status = 201 if method == "POST" else 200
+        if "vnd.pgrst.object" in self.headers.get("Accept", ""):
+            if len(rows) != 1:
+                return self._send_json({"message": "JSON object requested, multiple (or no) rows returned"}, status=406)
+            return self._send_json(rows[0], status=status)
+        return self._send_json(rows, status=status)
+
+    # --- /rest/v1/rpc/<fn> ---
+
+    def _rpc(self, name):
+        handler = RPCS.get(name)
+        args    = self._json_body() or {}
+        if handler is None:
+            return self._send_json({"message": f"function {name} not found"}, status=404)
+        with self.server.data_lock:
+            result = handler(self.server, args)
+        return self._send_json(result)
+
+    # --- /auth/v1 ---
+
+    def _issue_session(self, user):
+        import jwt
+
+        expires_at = int(time.time()) + 3600
+        token = jwt.encode({
+            "sub":   user["id"],
+            "email": user["email"],
+            "aud":   "authenticated",
+            "role":  "authenticated",
+            "exp":   expires_at,
+        }, self.server.jwt_secret, algorithm="HS256")
+
+        return {
+            "access_token":  token,
+            "token_type":    "bearer",
+            "expires_in":    3600,
+            "expires_at":    expires_at,
+            "refresh_token": uuid.uuid4().hex,
+            "user":          self._user_payload(user),
+        }
+
+    def _user_payload(self, user):
+        return {
+            "id":            user["id"],
+            "aud":           "authenticated",
+            "role":          "authenticated",
+            "email":         user["email"],
+            "app_metadata":  {"provider": "email"},
+            "user_metadata": user.get("user_metadata", {}),
+            "created_at":    user.get("created_at", _now()),
+        }
+
+    def _auth(self, method, path, query):
+        import jwt
+
+        body  = self._json_body() if method == "POST" else None
+        users = self.server.tables["users"]
+
+        if path == ["token"] and query.get("grant_type") == "password":
+            user = next((u for u in users if u["email"] == body.get("email")), None)
+            if user is None or user["password"] != body.get("password"):
+                return self._send_json({"error": "invalid_grant", "error_description": "Invalid login credentials"}, status=400)
+            return self._send_json(self._issue_session(user))
+
+        if path == ["signup"]:
+            with self.server.data_lock:
+                user = {
+                    "id": str(uuid.uuid4()), "email": body["email"], "password": body["password"],
+                    "user_metadata": (body.get("data") or {}), "created_at": _now(),
+                }
+                users.append(user)
+            return self._send_json(self._issue_session(user))
+
+        if path == ["user"]:
+            token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+            try:
+                claims = jwt.decode(token, self.server.jwt_secret, algorithms=["HS256"], audience="authenticated")
+            except jwt.PyJWTError:
+                return self._send_json({"message": "invalid token"}, status=401)
+            user = next((u for u in users if u["id"] == claims["sub"]), None)
+            if user is None:
+                return self._send_json({"message": "user not found"}, status=404)
+            return self._send_json(self._user_payload(user))
+
+        if path == ["logout"]:
+            return self._send_json(None, status=204)
+        return self._send_json({"message": "not found"}, status=404)
+
+    # --- /storage/v1/object/<bucket>/<key> ---
+
+    def _storage(self, method, path):
+        if method not in ("POST", "PUT") or len(path) < 2:
+            return self._send_json({"message": "not found"}, status=404)
+        data = self._read_body()
+        key  = "/".join(path)
+        with self.server.data_lock:
+            self.server.objects[key] = len(data)
+        return self._send_json({"Key": key})
+
+
+# --- Seed data ---------------------------------------------------------------
+
+def seed(posts=2000, comments_per_post=20, depth=6, users=50, categories=8, rng=None):
+    """Tables with ``posts`` news rows and comment threads up to ``depth`` deep.
+
+    Comments attach to a random earlier comment of the same post (or start
+    a new thread), so the busiest posts get long reply chains. One sign-in
+    user is ``bench@example.com`` / ``bench-password``.
+    """
+    rng = rng or random.Random(42)
+    now = datetime.now(timezone.utc)
+
+    user_rows = [{
+        "id": str(uuid.uuid4()), "email": f"user{i}@example.com", "password": "bench-password",
+    } for i in range(users)]
+    user_rows[0]["email"] = "bench@example.com"
+
+    profiles = [{
+        "id": u["id"], "username": f"user{i}", "avatar_url": None, "avatar_renditions": None,
+        "bio": None, "created_at": now.isoformat(), "updated_at": now.isoformat(),
+    } for i, u in enumerate(user_rows)]
+
+    category_rows = [{"id": i + 1, "name": f"Category {i + 1}"} for i in range(categories)]
+
+    news, comments = [], []
+    for i in range(posts):
+        created = (now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))).isoformat()
+        votes   = int(rng.paretovariate(1.5)) - 1
+        views   = votes * rng.randint(5, 40) + rng.randint(0, 200)
+        body    = " ".join(f"word{rng.randint(0, 5000)}" for _ in range(rng.randint(80, 400)))
+        row = {
+            "id": str(uuid.uuid4()), "author_id": rng.choice(user_rows)["id"],
+            "title": f"Benchmark post {i}", "content": f"<p>{body}</p>",
+            "excerpt": body[:280], "reading_time": max(1, round(len(body.split()) / 200)),
+            "first_image_url": None, "image_url": None, "image_renditions": None,
+            "category_id": rng.choice(category_rows)["id"],
+            "votes": votes, "views": views, "created_at": created, "updated_at": created,
+        }
+        _rescore(row)
+        news.append(row)
+
+        thread = []
+        for j in range(rng.randint(0, comments_per_post * 2)):
+            parent = rng.choice(thread) if thread and rng.random() < 0.7 else None
+            level  = parent["_depth"] + 1 if parent else 0
+            if level >= depth:
+                parent, level = None, 0
+            comment = {
+                "id": str(uuid.uuid4()), "news_id": row["id"], "author_id": rng.choice(user_rows)["id"],
+                "parent_id": parent["id"] if parent else None, "content": f"comment {j}",
+                "votes": rng.randint(-2, 30), "created_at": created, "updated_at": created,
+                "_depth": level,
+            }
+            thread.append(comment)
+        for comment in thread:
+            del comment["_depth"]
+        comments.extend(thread)
+
+    return {
+        "news": news, "comments": comments, "profiles": profiles,
+        "categories": category_rows, "users": user_rows,
+    }
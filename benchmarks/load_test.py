@@ -0,0 +1,283 @@
+"""
+Drive the news views at fixed concurrency levels against the local
+Supabase stand-in and report latency percentiles, throughput and backend
+calls per request.
+
+    python -m benchmarks.load_test --posts 2000 --concurrency 1,8,32 \\
+        --requests 300 --output bench.json
+    python -m benchmarks.load_test --baseline bench.json   # compare runs
+
+Requests go through Django's full middleware stack in-process (test
+client per worker thread). ``--no-cache`` swaps in a dummy cache so every
+request reaches the backend. The JSON output carries the commit it was
+measured on, so runs can be compared between commits.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+SCENARIOS = ("list", "detail", "api", "vote", "votes_batch")
+AUTHENTICATED = {"vote", "votes_batch"}
+JWT_SECRET = "bench-secret"
+
+
+def setup_django(server_url, use_cache, workdir):
+    os.environ["SUPABASE_URL"]        = server_url
+    os.environ["SUPABASE_KEY"]        = "bench.bench.bench"
+    os.environ["SUPABASE_JWT_SECRET"] = JWT_SECRET
+    os.environ["DATABASE_URL"]        = f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}"
+    os.environ["CACHE_URL"]           = "locmem://" if use_cache else "dummy://"
+    os.environ.setdefault("DJANGO_SECRET_KEY", "bench-secret-key")
+    # No collectstatic here, so no manifest to resolve hashed names from
+    os.environ.setdefault("STATICFILES_BACKEND", "django.contrib.staticfiles.storage.StaticFilesStorage")
+    os.environ.setdefault("INSTRUMENTATION_LOG_LEVEL", "WARNING")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    # Sessions (and the messages framework) live in the Django database
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+
+class Worker:
+    """One simulated visitor: a test client plus the state it carries."""
+
+    def __init__(self, tables, authenticated, rng):
+        from django.test import Client
+
+        self.client = Client()
+        self.tables = tables
+        self.rng    = rng
+        # (filter, next_cursor) of the last feed page: a cursor only makes
+        # sense for the filter whose sort columns it holds
+        self.cursor = None
+        if authenticated:
+            response = self.client.post("/auth/login", {
+                "email":    "bench@example.com",
+                "password": "bench-password",
+            })
+            if response.status_code != 302:
+                raise RuntimeError(f"Bench login failed with status {response.status_code}")
+
+    def news_id(self):
+        # Skew toward the first posts, like real traffic on front-page items
+        news = self.tables["news"]
+        return news[min(int(self.rng.paretovariate(1.2)) - 1, len(news) - 1)]["id"]
+
+    def request(self, scenario):
+        if scenario == "list":
+            return self.client.get("/news/")
+        if scenario == "detail":
+            return self.client.get(f"/news/{self.news_id()}/")
+        if scenario == "api":
+            # Half the requests follow the previous page's cursor
+            if self.cursor and self.rng.random() < 0.5:
+                filter_type, cursor = self.cursor
+                response = self.client.get("/news/api/", {"filter": filter_type, "cursor": cursor})
+            else:
+                filter_type = self.rng.choice(["new", "top", "hot", "best"])
+                response    = self.client.get("/news/api/", {"filter": filter_type})
+            if response.status_code == 200:
+                next_cursor = response.json().get("next_cursor")
+                self.cursor = (filter_type, next_cursor) if next_cursor else None
+            return response
+        if scenario == "vote":
+            return self.client.post(
+                f"/news/api/{self.news_id()}/vote/",
+                json.dumps({"value": self.rng.choice([1, -1])}),
+                content_type="application/json",
+            )
+        if scenario == "votes_batch":
+            votes = [{
+                "target": "news", "id": self.news_id(),
+                "value": self.rng.choice([1, -1]), "key": uuid.uuid4().hex,
+            } for _ in range(5)]
+            return self.client.post("/news/api/votes/", json.dumps({"votes": votes}), content_type="application/json")
+        raise ValueError(scenario)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def check_responsive(worker, scenario, timeout):
+    """Fail fast if one request does not finish, instead of hanging the pool."""
+    done = threading.Event()
+
+    def probe():
+        worker.request(scenario)
+        done.set()
+
+    threading.Thread(target=probe, daemon=True).start()
+    if not done.wait(timeout):
+        raise RuntimeError(
+            f"A single {scenario!r} request did not finish within {timeout:.0f}s; "
+            "the app is blocked (lock or connection pool), not just slow"
+        )
+
+
+def run_scenario(server, tables, scenario, concurrency, total, seed, timeout):
+    from django.core.cache import cache
+
+    workers = [
+        Worker(tables, scenario in AUTHENTICATED, random.Random(seed + i))
+        for i in range(concurrency)
+    ]
+    check_responsive(workers[0], scenario, timeout)
+    cache.clear()
+    server.reset_stats()
+
+    latencies = []
+    errors    = 0
+    lock      = threading.Lock()
+    counter   = iter(range(total))
+
+    def loop(worker):
+        nonlocal errors
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            started  = time.perf_counter()
+            response = worker.request(scenario)
+            elapsed  = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code >= 400:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(loop, workers))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario":                  scenario,
+        "concurrency":               concurrency,
+        "requests":                  len(latencies),
+        "errors":                    errors,
+        "throughput_rps":            round(len(latencies) / wall, 2),
+        "latency_ms": {
+            "p50":  round(percentile(latencies, 50), 2),
+            "p95":  round(percentile(latencies, 95), 2),
+            "p99":  round(percentile(latencies, 99), 2),
+            "mean": round(statistics.fmean(latencies), 2),
+            "max":  round(latencies[-1], 2),
+        },
+        "backend_calls_per_request": round(server.requests / max(len(latencies), 1), 2),
+        "backend_calls_by_kind":     dict(server.calls),
+        "backend_connections":       server.connections,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None, out=sys.stderr):
+    previous = {
+        (r["scenario"], r["concurrency"]): r for r in (baseline or {}).get("results", [])
+    }
+    print(f"{'scenario':<12} {'conc':>4} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'calls/req':>9} {'err':>4}", file=out)
+    for r in results:
+        lat  = r["latency_ms"]
+        line = (
+            f"{r['scenario']:<12} {r['concurrency']:>4} {r['throughput_rps']:>9.1f} "
+            f"{lat['p50']:>8.1f} {lat['p95']:>8.1f} {lat['p99']:>8.1f} "
+            f"{r['backend_calls_per_request']:>9.2f} {r['errors']:>4}"
+        )
+        old = previous.get((r["scenario"], r["concurrency"]))
+        if old:
+            delta = (lat["p95"] - old["latency_ms"]["p95"]) / old["latency_ms"]["p95"] * 100
+            line += f"   p95 {delta:+.1f}% vs {baseline['meta'].get('commit') or 'baseline'}"
+        print(line, file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=20, help="average comments per post")
+    parser.add_argument("--depth", type=int, default=6, help="maximum comment nesting")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and level")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of simulated backend latency per call")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds before a single request counts as hung")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="previous JSON results to compare p95 against")
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown   = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    from benchmarks.fake_supabase import FakeSupabaseServer, seed
+
+    tables = seed(args.posts, args.comments, args.depth, rng=random.Random(args.seed))
+    server = FakeSupabaseServer(tables, jwt_secret=JWT_SECRET, latency=args.latency).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            setup_django(server.url, not args.no_cache, workdir)
+            results = [
+                run_scenario(server, tables, scenario, level, args.requests, args.seed, args.timeout)
+                for scenario in scenarios
+                for level in levels
+            ]
+    finally:
+        server.stop()
+
+    report = {
+        "meta": {
+            "commit":    git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python":    platform.python_version(),
+            "posts":     args.posts,
+            "comments":  len(tables["comments"]),
+            "cache":     not args.no_cache,
+            "latency":   args.latency,
+        },
+        "results": results,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    # The table goes to stderr so stdout stays valid JSON
+    print_table(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
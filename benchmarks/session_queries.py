@@ -0,0 +1,83 @@
+"""
+Count Django database queries per request for each session engine, for
+anonymous and signed-in reads of the feed and a post.
+
+    python -m benchmarks.session_queries --requests 50
+    python -m benchmarks.session_queries --modes db,signed_cookies
+
+Runs against benchmarks.fake_supabase; DATABASE_URL is a throwaway SQLite
+file, so every query counted here is a session (or messages) lookup.
+"""
+import argparse
+import random
+import tempfile
+
+PAGES = ("list", "detail")
+
+
+def count_queries(client, path, total):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(total):
+            response = client.get(path)
+            assert response.status_code in (200, 304), (path, response.status_code)
+    return len(queries) / total
+
+
+def run_mode(mode, tables, total):
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.test import Client, override_settings
+
+    from benchmarks.load_test import Worker
+
+    paths   = {"list": "/news/", "detail": f"/news/{tables['news'][0]['id']}/"}
+    results = []
+    # SessionMiddleware picks its engine when the handler is built, so each
+    # client is created under the override
+    with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[mode]):
+        for signed_in in (False, True):
+            cache.clear()
+            client = Worker(tables, signed_in, random.Random(0)).client if signed_in else Client()
+            for page in PAGES:
+                results.append({
+                    "mode":                mode,
+                    "user":                "signed-in" if signed_in else "anonymous",
+                    "page":                page,
+                    "queries_per_request": round(count_queries(client, paths[page], total), 2),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", default="db,cached_db,signed_cookies")
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="requests per page, user and mode")
+    args = parser.parse_args()
+
+    from benchmarks.fake_supabase import FakeSupabaseServer, seed
+    from benchmarks.load_test import JWT_SECRET, setup_django
+
+    tables = seed(args.posts, 5, 3, rng=random.Random(42))
+    server = FakeSupabaseServer(tables, jwt_secret=JWT_SECRET).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            setup_django(server.url, True, workdir)
+            results = [
+                row
+                for mode in args.modes.split(",") if mode
+                for row in run_mode(mode, tables, args.requests)
+            ]
+    finally:
+        server.stop()
+
+    print(f"{'mode':<16} {'user':<10} {'page':<7} {'queries/req':>11}")
+    for r in results:
+        print(f"{r['mode']:<16} {r['user']:<10} {r['page']:<7} {r['queries_per_request']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Count connections (and therefore TLS handshakes in production) opened while
+rendering ``news_detail``, with a fresh client per call versus the shared pool.
+
+    python -m benchmarks.supabase_connections --renders 20
+
+Runs against benchmarks.fake_supabase, so no hosted project is needed.
+"""
+import argparse
+import os
+import uuid
+from unittest import mock
+
+NEWS_ID   = str(uuid.uuid4())
+AUTHOR_ID = str(uuid.uuid4())
+
+
+def seed_tables(comments=10):
+    news = [{
+        "id": NEWS_ID, "author_id": AUTHOR_ID, "title": "Benchmark post",
+        "content": "<p>Hello</p>", "image_url": None, "votes": 0, "views": 0,
+        "created_at": "2026-01-01T00:00:00+00:00", "updated_at": "2026-01-01T00:00:00+00:00",
+    }]
+    rows = [{
+        "id": str(uuid.uuid4()), "news_id": NEWS_ID, "author_id": AUTHOR_ID,
+        "parent_id": None, "content": f"comment {i}", "votes": i,
+        "created_at": "2026-01-01T00:00:00+00:00", "updated_at": "2026-01-01T00:00:00+00:00",
+    } for i in range(comments)]
+    profiles = [{"id": AUTHOR_ID, "username": "bench", "avatar_url": None}]
+    return {"news": news, "comments": rows, "profiles": profiles}
+
+
+def setup_django(server_url):
+    os.environ["SUPABASE_URL"] = server_url
+    os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+    os.environ.setdefault("DJANGO_SECRET_KEY", "bench-secret-key")
+    os.environ.setdefault("STATICFILES_BACKEND", "django.contrib.staticfiles.storage.StaticFilesStorage")
+    os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+    import django
+    django.setup()
+
+
+def render_detail(renders):
+    from django.core.cache import cache
+    from django.test import RequestFactory
+    from news.views import news_detail
+
+    factory = RequestFactory()
+    for _ in range(renders):
+        # Measure the Supabase fetches, not the response cache
+        cache.clear()
+        request = factory.get(f"/news/{NEWS_ID}/")
+        request.session       = {}
+        request.supabase_user = None
+        response = news_detail(request, uuid.UUID(NEWS_ID))
+        assert response.status_code == 200, response.status_code
+
+
+def run(server, label, renders):
+    server.reset_stats()
+    render_detail(renders)
+    print(
+        f"{label:<10} renders={renders:<4} "
+        f"connections={server.connections:<5} "
+        f"per_render={server.connections / renders:.2f} "
+        f"requests={server.requests}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--comments", type=int, default=10)
+    args = parser.parse_args()
+
+    from benchmarks.fake_supabase import FakeSupabaseServer
+
+    server = FakeSupabaseServer(seed_tables(args.comments)).start()
+    try:
+        setup_django(server.url)
+
+        from django.conf import settings
+        from supabase import create_client
+        from core import supabase as core_supabase
+
+        def fresh_client():
+            return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+
+        with mock.patch("news.views.get_supabase_client", fresh_client):
+            run(server, "before", args.renders)
+
+        core_supabase.reset_supabase_client()
+        run(server, "after", args.renders)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
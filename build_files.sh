@@ -0,0 +1,8 @@
+#!/bin/sh
+# Vercel build step (see vercel.json): compiles the stylesheet, vendors the
+# pinned front-end files and collects everything, hashed, into STATIC_ROOT
+# before the Python function is bundled with it.
+set -e
+
+python3 -m pip install -r requirements.txt
+python3 manage.py build_assets --collectstatic
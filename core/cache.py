@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _version_key(namespace):
+    return f"ver:{namespace}"
+
+
+def _modified_key(namespace):
+    return f"mod:{namespace}"
+
+
+def _fresh_version():
+    # Time-based so a version evicted from the cache never comes back at a
+    # value older entries were stored under.
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        cache.add(_version_key(namespace), _fresh_version(), None)
+        version = cache.get(_version_key(namespace))
+    return version
+
+
+def bump_version(*namespaces):
+    """Invalidate every entry stored under ``namespaces``."""
+    now = int(time.time())
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            cache.set(_version_key(namespace), _fresh_version(), None)
+        cache.set(_modified_key(namespace), now, None)
+
+
+def last_modified(namespaces):
+    """Unix time of the latest bump of any of ``namespaces`` (Last-Modified).
+
+    A namespace never bumped since its stamp was evicted counts as modified
+    now, which only costs clients one full response.
+    """
+    keys    = [_modified_key(ns) for ns in namespaces]
+    stamps  = cache.get_many(keys)
+    missing = [key for key in keys if key not in stamps]
+    for key in missing:
+        cache.add(key, int(time.time()), None)
+    if missing:
+        stamps.update(cache.get_many(missing))
+    return max(stamps.values(), default=int(time.time()))
+
+
+def _record(name, outcome):
+    key = f"stats:{name}:{outcome}"
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def make_key(name, namespaces, parts):
+    versions = ":".join(str(get_version(ns)) for ns in namespaces)
+    digest   = hashlib.md5(json.dumps(parts, default=str).encode()).hexdigest()
+    return f"resp:{name}:{versions}:{digest}"
+
+
+def _should_refresh(entry):
+    # XFetch: recompute early with a probability that grows as expiry nears
+    # and with how long the value took to compute.
+    _, expires_at, delta = entry
+    jitter = -delta * settings.CACHE_EARLY_BETA * math.log(1.0 - random.random())
+    return time.time() + jitter >= expires_at
+
+
+def _store(key, ttl, compute):
+    started = time.time()
+    value   = compute()
+    delta   = time.time() - started
+    cache.set(key, (value, time.time() + ttl, delta), ttl + settings.CACHE_STALE_GRACE)
+    return value
+
+
+def cached(name, namespaces, parts, ttl, compute):
+    """Return the cached result of ``compute()`` or compute and store it.
+
+    Entries are keyed by ``name``, the current version of each namespace
+    and ``parts``; bumping any namespace version makes them unreachable.
+    Only the worker holding the key's lock recomputes it; the others serve
+    the stale copy, or wait briefly for the first value on a cold key.
+    """
+    key   = make_key(name, namespaces, parts)
+    lock  = f"lock:{key}"
+    entry = cache.get(key)
+
+    if entry is not None and not _should_refresh(entry):
+        _record(name, "hit")
+        return entry[0]
+
+    if cache.add(lock, 1, settings.CACHE_LOCK_TIMEOUT):
+        _record(name, "miss")
+        try:
+            return _store(key, ttl, compute)
+        finally:
+            cache.delete(lock)
+
+    if entry is not None:
+        _record(name, "stale")
+        return entry[0]
+
+    deadline = time.time() + settings.CACHE_LOCK_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            _record(name, "hit")
+            return entry[0]
+        if cache.get(lock) is None:
+            break
+
+    _record(name, "miss")
+    return _store(key, ttl, compute)
+
+
+async def _aget_version(namespace):
+    version = await cache.aget(_version_key(namespace))
+    if version is None:
+        await cache.aadd(_version_key(namespace), _fresh_version(), None)
+        version = await cache.aget(_version_key(namespace))
+    return version
+
+
+async def _arecord(name, outcome):
+    key = f"stats:{name}:{outcome}"
+    if not await cache.aadd(key, 1, None):
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, None)
+
+
+async def _astore(key, ttl, acompute):
+    started = time.time()
+    value   = await acompute()
+    delta   = time.time() - started
+    await cache.aset(key, (value, time.time() + ttl, delta), ttl + settings.CACHE_STALE_GRACE)
+    return value
+
+
+async def acached(name, namespaces, parts, ttl, acompute):
+    """Async twin of ``cached`` for async views; ``acompute`` is awaited."""
+    versions = ":".join([str(await _aget_version(ns)) for ns in namespaces])
+    digest   = hashlib.md5(json.dumps(parts, default=str).encode()).hexdigest()
+    key      = f"resp:{name}:{versions}:{digest}"
+    lock     = f"lock:{key}"
+    entry    = await cache.aget(key)
+
+    if entry is not None and not _should_refresh(entry):
+        await _arecord(name, "hit")
+        return entry[0]
+
+    if await cache.aadd(lock, 1, settings.CACHE_LOCK_TIMEOUT):
+        await _arecord(name, "miss")
+        try:
+            return await _astore(key, ttl, acompute)
+        finally:
+            await cache.adelete(lock)
+
+    if entry is not None:
+        await _arecord(name, "stale")
+        return entry[0]
+
+    deadline = time.time() + settings.CACHE_LOCK_TIMEOUT
+    while time.time() < deadline:
+        await asyncio.sleep(0.05)
+        entry = await cache.aget(key)
+        if entry is not None:
+            await _arecord(name, "hit")
+            return entry[0]
+        if await cache.aget(lock) is None:
+            break
+
+    await _arecord(name, "miss")
+    return await _astore(key, ttl, acompute)
+
+
+def cache_stats(names):
+    """Hit/miss counters per cached view name."""
+    keys   = [f"stats:{name}:{outcome}" for name in names for outcome in ("hit", "stale", "miss")]
+    counts = cache.get_many(keys)
+
+    stats = {}
+    for name in names:
+        hits   = counts.get(f"stats:{name}:hit", 0)
+        stale  = counts.get(f"stats:{name}:stale", 0)
+        misses = counts.get(f"stats:{name}:miss", 0)
+        total  = hits + stale + misses
+        stats[name] = {
+            "hits":     hits,
+            "stale":    stale,
+            "misses":   misses,
+            "hit_rate": round((hits + stale) / total, 4) if total else None,
+        }
+    return stats
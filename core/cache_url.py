@@ -0,0 +1,52 @@
+"""
+Build a Django CACHES entry from a URL, in the spirit of dj_database_url.
+
+    redis://[:password@]host:6379/0      shared, needs `redis`
+    rediss://...                         same, over TLS
+    memcached://host:11211[,host2:11211] shared, needs `pymemcache`
+    file:///tmp/game-news-cache          single node, survives restarts
+    file://.cache/django                 same, relative to ``base_dir``
+    locmem://                            per process (default)
+    dummy://                             no caching (benchmarks, debugging)
+"""
+import os
+from urllib.parse import urlsplit
+
+BACKENDS = {
+    "redis":     "django.core.cache.backends.redis.RedisCache",
+    "rediss":    "django.core.cache.backends.redis.RedisCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+    "file":      "django.core.cache.backends.filebased.FileBasedCache",
+    "locmem":    "django.core.cache.backends.locmem.LocMemCache",
+    "dummy":     "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def parse(url, key_prefix="", timeout=300, base_dir=None):
+    url    = url or "locmem://"
+    scheme = urlsplit(url).scheme
+
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unsupported cache URL scheme: {scheme!r}")
+
+    config = {
+        "BACKEND":    BACKENDS[scheme],
+        "KEY_PREFIX": key_prefix,
+        "TIMEOUT":    timeout,
+    }
+
+    if scheme in ("redis", "rediss"):
+        config["LOCATION"] = url
+    elif scheme == "memcached":
+        config["LOCATION"] = url.split("://", 1)[1].split(",")
+    elif scheme == "file":
+        # file:///abs/path keeps its path; file://rel/path would otherwise
+        # split into a "rel" host and a "/path" path
+        path = url.split("://", 1)[1]
+        if not path:
+            raise ValueError("file:// cache URL needs a directory")
+        config["LOCATION"] = os.path.join(base_dir or os.getcwd(), path)
+    else:
+        config["LOCATION"] = urlsplit(url).netloc or "unique-snowflake"
+
+    return config
@@ -0,0 +1,120 @@
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from accounts.session import USER_EMAIL, USER_ID
+from core.cache import get_version, last_modified
+
+
+def _validators(request, name, namespaces, per_user, ttl=None):
+    """ETag and Last-Modified from the cache version stamps alone.
+
+    Versions change on every write that invalidates the cached data, so a
+    matching validator means the body would be identical and the view (and
+    its Supabase queries) can be skipped.
+    """
+    parts = [name, request.get_full_path()]
+    parts += [f"{ns}={get_version(ns)}" for ns in namespaces]
+    if per_user:
+        # Pages render the signed-in user and a CSRF token
+        parts += [
+            request.session.get(USER_ID) or "",
+            request.session.get(USER_EMAIL) or "",
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+        ]
+
+    modified = last_modified(namespaces)
+    if ttl:
+        # The cached data can also change when its TTL runs out (votes do
+        # not bump "feed"); rolling the validators over every ``ttl`` keeps
+        # a revalidated copy at most one more TTL behind
+        bucket   = int(time.time() // ttl)
+        parts   += [f"ttl={bucket}"]
+        modified = max(modified, bucket * ttl)
+
+    etag = quote_etag(hashlib.sha256("\n".join(map(str, parts)).encode()).hexdigest()[:32])
+    if per_user:
+        # The masked CSRF token differs byte-for-byte between renders
+        etag = f"W/{etag}"
+    return etag, modified
+
+
+def _shared_cacheable(request, response, per_user):
+    if not per_user:
+        return True
+    return (
+        settings.HTTP_CACHE_PUBLIC_PAGES
+        and not request.session.get(USER_ID)
+        and not response.cookies
+    )
+
+
+def _finish(request, response, etag, modified, per_user):
+    if response.status_code not in (200, 304):
+        return response
+
+    response.headers.setdefault("ETag", etag)
+    response.headers.setdefault("Last-Modified", http_date(modified))
+
+    if _shared_cacheable(request, response, per_user):
+        # Browsers revalidate every time; a CDN may serve it for s-maxage
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=0,
+            s_maxage=settings.HTTP_CACHE_S_MAXAGE,
+            stale_while_revalidate=settings.HTTP_CACHE_STALE_WHILE_REVALIDATE,
+        )
+        if per_user:
+            patch_vary_headers(response, ("Cookie",))
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_view(name, namespaces, per_user=False, ttl=None):
+    """Answer conditional GETs for a view cached under ``namespaces``.
+
+    ``namespaces`` is a list, or a callable taking the view's arguments
+    (``lambda request, pk: [f"news:{pk}"]``). ``per_user`` marks HTML pages
+    whose body depends on the session; they are private unless
+    HTTP_CACHE_PUBLIC_PAGES allows anonymous copies on a CDN. ``ttl`` is
+    for data that may change without a namespace bump, only by expiring.
+    """
+    def resolve(request, args, kwargs):
+        if callable(namespaces):
+            return namespaces(request, *args, **kwargs)
+        return namespaces
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            async def _wrapped_view(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view_func(request, *args, **kwargs)
+
+                etag, modified = await sync_to_async(_validators)(
+                    request, name, resolve(request, args, kwargs), per_user, ttl
+                )
+                response = get_conditional_response(request, etag=etag, last_modified=modified)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return await sync_to_async(_finish)(request, response, etag, modified, per_user)
+            return markcoroutinefunction(wraps(view_func)(_wrapped_view))
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+
+            etag, modified = _validators(request, name, resolve(request, args, kwargs), per_user, ttl)
+            response = get_conditional_response(request, etag=etag, last_modified=modified)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return _finish(request, response, etag, modified, per_user)
+        return _wrapped_view
+    return decorator
@@ -1,6 +1,9 @@
+from accounts.session import USER_EMAIL, USER_ID
+
+
 def supabase_auth(request):
     return {
-        "is_authenticated": bool(request.session.get("supabase_user_id")),
-        "user_email": request.session.get("user_email"),
-        "user_id":          request.session.get("supabase_user_id"),
+        "is_authenticated": bool(request.session.get(USER_ID)),
+        "user_email": request.session.get(USER_EMAIL),
+        "user_id":          request.session.get(USER_ID),
     }
\ No newline at end of file
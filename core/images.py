@@ -0,0 +1,150 @@
+import contextvars
+import io
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from core.uploads import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Pillow is imported inside the functions below: only upload requests need
+# it, so it stays off the cold-start path.
+
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+NEWS_IMAGE_WIDTHS = (320, 640, 1280)
+AVATAR_WIDTHS     = (96, 192)
+
+
+class ImageProcessingError(ValueError):
+    """Raised when an upload is not a usable image."""
+
+
+def _open(uploaded_file, max_width):
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(uploaded_file, formats=settings.IMAGE_ALLOWED_FORMATS)
+    except Image.DecompressionBombError as e:
+        raise ImageProcessingError("Image dimensions are too large") from e
+    except (UnidentifiedImageError, OSError) as e:
+        raise ImageProcessingError("File is not a valid image") from e
+
+    # Only the header has been read so far. draft() below shrinks JPEGs
+    # while decoding, but PNG, WebP and GIF always decode at full size, so
+    # this cap is what bounds their memory.
+    width, height = image.size
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ImageProcessingError("Image dimensions are too large")
+
+    image.draft("RGB", (max_width, max_width))
+
+    try:
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError("Image could not be decoded") from e
+    return image
+
+
+def _without_metadata(image):
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    clean     = image.convert("RGBA" if has_alpha else "RGB")
+    clean.info = {}
+    return clean
+
+
+def _encode(image, fmt):
+    from PIL import Image
+
+    pil_format, _, options = FORMATS[fmt]
+    if pil_format == "JPEG" and image.mode != "RGB":
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def render_renditions(uploaded_file, widths):
+    """Decode ``uploaded_file`` once and encode it at each width and format.
+
+    Returns ``{(fmt, width): bytes}``. Widths larger than the source are
+    collapsed to the source width so images are never upscaled.
+    """
+    from PIL import Image
+
+    source = _without_metadata(_open(uploaded_file, max(widths)))
+
+    renditions = {}
+    for width in sorted({min(w, source.width) for w in widths}):
+        if width == source.width:
+            resized = source
+        else:
+            height  = max(1, round(source.height * width / source.width))
+            resized = source.resize((width, height), Image.LANCZOS)
+        for fmt in FORMATS:
+            renditions[(fmt, width)] = _encode(resized, fmt)
+    return renditions
+
+
+def upload_image(uploaded_file, prefix, widths=NEWS_IMAGE_WIDTHS, bucket="news_bucket"):
+    """Process an upload and store its renditions under ``prefix/<id>/``.
+
+    Keys are ``<prefix>/<id>/<width>.<ext>``. Returns the largest JPEG URL
+    (for ``image_url``/``avatar_url``) and a ``{fmt: {width: url}}`` map
+    for ``srcset``.
+    """
+    renditions = render_renditions(uploaded_file, widths)
+    storage    = get_storage(bucket)
+    base       = f"{prefix}/{uuid.uuid4()}"
+
+    def store(item):
+        (fmt, width), data = item
+        key = f"{base}/{width}.{'jpg' if fmt == 'jpeg' else fmt}"
+        storage.upload(key, io.BytesIO(data), FORMATS[fmt][1], cache_control=31536000)
+        return fmt, width, storage.get_public_url(key)
+
+    urls = {fmt: {} for fmt in FORMATS}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # Each upload runs in a copy of this context so it shows up in the
+        # request's instrumentation trace
+        futures = [
+            pool.submit(contextvars.copy_context().run, store, item)
+            for item in renditions.items()
+        ]
+        for future in futures:
+            fmt, width, url = future.result()
+            urls[fmt][str(width)] = url
+
+    largest = max(urls["jpeg"], key=int)
+    return urls["jpeg"][largest], urls
+
+
+def delete_image(renditions, bucket="news_bucket"):
+    """Delete the stored files behind an ``image_renditions`` map.
+
+    Called after a replaced image is no longer referenced. Best effort: a
+    failure leaves orphaned files, not a broken page, so it is only logged.
+    """
+    storage = get_storage(bucket)
+    keys    = [
+        key
+        for urls in (renditions or {}).values()
+        for url in urls.values()
+        if (key := storage.key_for_url(url))
+    ]
+    if not keys:
+        return
+    try:
+        storage.delete(keys)
+    except Exception:
+        logger.exception("Could not delete %d replaced image files", len(keys))
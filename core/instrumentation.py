@@ -0,0 +1,248 @@
+import contextvars
+import functools
+import json
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from urllib.parse import parse_qsl
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_trace = contextvars.ContextVar("supabase_trace", default=None)
+
+# Filter values are dropped from the shape: ``id=eq.1`` and ``id=eq.2``
+# are the same query run twice.
+OPERATOR_RE = re.compile(r"^(not\.)?[a-z]+(?=\.)")
+
+
+def start_trace():
+    """Begin collecting Supabase calls for the current request/context."""
+    return _trace.set([])
+
+
+def end_trace(token):
+    calls = _trace.get() or []
+    _trace.reset(token)
+    return calls
+
+
+def classify(url):
+    """``(kind, target)`` for a Supabase URL: postgrest/rpc/storage/auth."""
+    path = url.path
+    if path.startswith("/rest/v1/rpc/"):
+        return "rpc", path[len("/rest/v1/rpc/"):]
+    if path.startswith("/rest/v1/"):
+        return "postgrest", path[len("/rest/v1/"):]
+    if path.startswith("/storage/v1/"):
+        # object/<bucket>/<key> -> object/<bucket>
+        return "storage", "/".join(path[len("/storage/v1/"):].split("/")[:2])
+    if path.startswith("/auth/v1/"):
+        return "auth", path[len("/auth/v1/"):]
+    return "http", url.host
+
+
+def query_shape(method, kind, target, query):
+    params = []
+    for key, value in parse_qsl(query.decode() if isinstance(query, bytes) else query):
+        match = OPERATOR_RE.match(value)
+        if key in ("select", "order", "limit", "offset"):
+            params.append(f"{key}={value}")
+        else:
+            params.append(f"{key}={match.group(0) if match else ''}")
+    return f"{method} {kind}:{target}?{'&'.join(sorted(params))}"
+
+
+def record(request, started, received):
+    calls = _trace.get()
+    if calls is None:
+        return
+
+    kind, target = classify(request.url)
+    call = {
+        "kind":   kind,
+        "target": target,
+        "method": request.method,
+        "ms":     round((time.perf_counter() - started) * 1000, 2),
+        "bytes":  received,
+        "shape":  query_shape(request.method, kind, target, request.url.query),
+    }
+    calls.append(call)
+
+    if call["ms"] >= settings.INSTRUMENTATION_SLOW_MS:
+        logger.warning("Slow Supabase call: %s %s:%s took %.1f ms", call["method"], kind, target, call["ms"])
+
+
+@functools.cache
+def _transport_classes():
+    import httpx
+
+    class _RecordingStream(httpx.SyncByteStream):
+        def __init__(self, stream, request, started):
+            self._stream   = stream
+            self._request  = request
+            self._started  = started
+            self._received = 0
+
+        def __iter__(self):
+            for chunk in self._stream:
+                self._received += len(chunk)
+                yield chunk
+
+        def close(self):
+            try:
+                self._stream.close()
+            finally:
+                record(self._request, self._started, self._received)
+
+    class _AsyncRecordingStream(httpx.AsyncByteStream):
+        def __init__(self, stream, request, started):
+            self._stream   = stream
+            self._request  = request
+            self._started  = started
+            self._received = 0
+
+        async def __aiter__(self):
+            async for chunk in self._stream:
+                self._received += len(chunk)
+                yield chunk
+
+        async def aclose(self):
+            try:
+                await self._stream.aclose()
+            finally:
+                record(self._request, self._started, self._received)
+
+    class InstrumentedTransport(httpx.BaseTransport):
+        """Times each call until its body is read and counts the bytes."""
+
+        def __init__(self, transport):
+            self._transport = transport
+
+        def handle_request(self, request):
+            started  = time.perf_counter()
+            response = self._transport.handle_request(request)
+            response.stream = _RecordingStream(response.stream, request, started)
+            return response
+
+        def close(self):
+            self._transport.close()
+
+    class AsyncInstrumentedTransport(httpx.AsyncBaseTransport):
+        def __init__(self, transport):
+            self._transport = transport
+
+        async def handle_async_request(self, request):
+            started  = time.perf_counter()
+            response = await self._transport.handle_async_request(request)
+            response.stream = _AsyncRecordingStream(response.stream, request, started)
+            return response
+
+        async def aclose(self):
+            await self._transport.aclose()
+
+    return InstrumentedTransport, AsyncInstrumentedTransport
+
+
+def instrumented_transport(**options):
+    """``httpx.HTTPTransport(**options)`` that records into the request trace."""
+    import httpx
+
+    InstrumentedTransport, _ = _transport_classes()
+    return InstrumentedTransport(httpx.HTTPTransport(**options))
+
+
+def instrumented_async_transport(**options):
+    import httpx
+
+    _, AsyncInstrumentedTransport = _transport_classes()
+    return AsyncInstrumentedTransport(httpx.AsyncHTTPTransport(**options))
+
+
+def summarize(calls):
+    by_kind = defaultdict(lambda: {"calls": 0, "ms": 0.0, "bytes": 0})
+    for call in calls:
+        totals = by_kind[call["kind"]]
+        totals["calls"] += 1
+        totals["ms"]    += call["ms"]
+        totals["bytes"] += call["bytes"]
+
+    # N+1: the same query shape issued repeatedly within one request
+    shapes     = Counter(call["shape"] for call in calls)
+    n_plus_one = {
+        shape: count for shape, count in shapes.items()
+        if count >= settings.INSTRUMENTATION_N_PLUS_ONE
+    }
+    return dict(by_kind), n_plus_one
+
+
+def server_timing(by_kind, total_ms):
+    entries = [
+        f'{kind};dur={totals["ms"]:.1f};desc="{totals["calls"]} calls, {totals["bytes"]} B"'
+        for kind, totals in sorted(by_kind.items())
+    ]
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+class InstrumentationMiddleware:
+    """Per-request record of every Supabase call made through the shared pools.
+
+    Emits a ``Server-Timing`` header (when enabled) and one structured log
+    line per request; slow calls and repeated query shapes (N+1) are logged
+    as warnings.
+    """
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        token   = start_trace()
+        try:
+            response = self.get_response(request)
+        finally:
+            calls = end_trace(token)
+        return self.process(request, response, calls, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        token   = start_trace()
+        try:
+            response = await self.get_response(request)
+        finally:
+            calls = end_trace(token)
+        return self.process(request, response, calls, started)
+
+    def process(self, request, response, calls, started):
+        total_ms            = (time.perf_counter() - started) * 1000
+        by_kind, n_plus_one = summarize(calls)
+
+        if settings.INSTRUMENTATION_SERVER_TIMING:
+            response["Server-Timing"] = server_timing(by_kind, total_ms)
+
+        for shape, count in n_plus_one.items():
+            logger.warning("Possible N+1 on %s: %s issued %d times", request.path, shape, count)
+
+        logger.info(json.dumps({
+            "method":     request.method,
+            "path":       request.path,
+            "status":     response.status_code,
+            "ms":         round(total_ms, 2),
+            "calls":      len(calls),
+            "call_ms":    round(sum(call["ms"] for call in calls), 2),
+            "bytes":      sum(call["bytes"] for call in calls),
+            "by_kind":    by_kind,
+            "n_plus_one": n_plus_one,
+        }))
+        return response
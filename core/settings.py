@@ -12,9 +12,12 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 from pathlib import Path
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 import os
 
+from core import cache_url
+
 load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -25,7 +28,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-1-39@pb!akf9r=&vf+4!goqgj!$0u)2f7jvzwcwf-w5jdc9033'
+# It signs the session cookie (see SESSION_MODE), so it must never be
+# committed: refuse to start without one.
+SECRET_KEY = os.getenv("DJANGO_SECRET_KEY")
+if not SECRET_KEY:
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY in the environment (or .env)")
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DEBUG') == 'True'
@@ -34,21 +41,24 @@ ALLOWED_HOSTS = ['*']
 
 # Application definition
 
+# The admin is only useful where DATABASE_URL points at the real tables;
+# serverless deployments can drop it (and its autodiscovery) from startup.
+ADMIN_ENABLED = os.getenv("DJANGO_ADMIN_ENABLED", "True") == "True"
+
 INSTALLED_APPS = [
-    'ckeditor',
-    'django.contrib.admin',
+    *(['django.contrib.admin'] if ADMIN_ENABLED else []),
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'django.contrib.humanize',
     'todos',
     'accounts',
     'news',
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -80,6 +90,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'core.wsgi.application'
 
+# Route news_detail, news_update and profile_view to their async versions.
+# Set by core/asgi.py; WSGI (Vercel) keeps the sync views.
+ASYNC_VIEWS = os.getenv("DJANGO_ASYNC_VIEWS") == "True"
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
@@ -100,6 +114,26 @@ DATABASES = {
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Shared connection pool used by core.supabase (keep-alive + HTTP/2 reuse)
+SUPABASE_HTTP2                  = os.getenv("SUPABASE_HTTP2", "True") == "True"
+SUPABASE_TIMEOUT                = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+SUPABASE_POOL_MAX_CONNECTIONS   = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+SUPABASE_POOL_MAX_KEEPALIVE     = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+SUPABASE_POOL_KEEPALIVE_EXPIRY  = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY", "30"))
+
+# Local access-token verification (accounts.tokens). SUPABASE_JWT_SECRET is
+# the project's JWT secret (Dashboard > Project Settings > API) and is
+# required for projects that still sign tokens with HS256; asymmetric keys
+# are fetched from SUPABASE_JWKS_URL instead. Without a way to check a
+# token, signed-in users are treated as anonymous but stay signed in.
+SUPABASE_JWT_SECRET             = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWT_AUDIENCE           = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+SUPABASE_JWT_LEEWAY             = int(os.getenv("SUPABASE_JWT_LEEWAY", "0"))
+SUPABASE_JWKS_URL               = os.getenv("SUPABASE_JWKS_URL", f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json")
+SUPABASE_JWKS_LIFESPAN          = int(os.getenv("SUPABASE_JWKS_LIFESPAN", "600"))
+SUPABASE_AUTH_REMOTE_FALLBACK   = os.getenv("SUPABASE_AUTH_REMOTE_FALLBACK", "False") == "True"
+SUPABASE_AUTH_CACHE_SIZE        = int(os.getenv("SUPABASE_AUTH_CACHE_SIZE", "1024"))
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -140,7 +174,38 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [
     BASE_DIR / "assets",
 ]
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Hashed, compressed copies from collectstatic (build_files.sh runs it on
+# every deploy); WhiteNoise serves hashed names with a far-future
+# "immutable" Cache-Control. {% static %} needs the manifest collectstatic
+# writes, so the benchmarks point STATICFILES_BACKEND at the plain storage.
+STATICFILES_BACKEND = os.getenv("STATICFILES_BACKEND", "whitenoise.storage.CompressedManifestStaticFilesStorage")
+STORAGES = {
+    "default":     {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": STATICFILES_BACKEND},
+}
+
+# Front-end build (news build_assets): Tailwind standalone CLI version to
+# download, or TAILWIND_CLI to use an existing binary instead.
+TAILWIND_VERSION = os.getenv("TAILWIND_VERSION", "4.1.13")
+TAILWIND_CLI     = os.getenv("TAILWIND_CLI")
+
+# Upload pipeline (core.images): decoded images are capped at this many
+# pixels so a single upload cannot exhaust lambda memory.
+IMAGE_MAX_PIXELS      = int(os.getenv("IMAGE_MAX_PIXELS", str(40_000_000)))
+IMAGE_ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP", "GIF")
+
+# Uploads (core.uploads): files over UPLOAD_MAX_BYTES are dropped while the
+# request body is still being parsed; anything over the in-memory limit is
+# spooled to a temp file instead of RAM. UPLOAD_STORAGE=local writes to
+# MEDIA_ROOT instead of Supabase Storage.
+UPLOAD_MAX_BYTES            = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_STORAGE              = os.getenv("UPLOAD_STORAGE", "supabase")
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", str(512 * 1024)))
+FILE_UPLOAD_HANDLERS = [
+    "core.uploads.MaxSizeUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -157,9 +222,98 @@ SESSION_COOKIE_AGE = 86400
 # 4. Prevent CSRF on session cookies
 SESSION_COOKIE_SAMESITE = 'Lax'
 
+# 5. Where sessions live (SESSION_MODE). The payload is only the user id,
+# email and access token (short keys, see accounts.session), so the default
+# keeps it in the signed cookie and reads never touch DATABASE_URL.
+# "cached_db" reads through the shared cache instead; "db" is Django's
+# default table. Logging out clears the cookie; a signed cookie cannot be
+# revoked server-side, but the access token inside still expires. Views
+# act as the verified token's user (request.supabase_user), never as the
+# session's user id, which only drives display.
+SESSION_ENGINES = {
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    "cached_db":      "django.contrib.sessions.backends.cached_db",
+    "db":             "django.contrib.sessions.backends.db",
+}
+SESSION_MODE   = os.getenv("SESSION_MODE", "signed_cookies")
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+
+# Shared cache for every lambda instance, chosen by CACHE_URL (see
+# core.cache_url): redis://, memcached://, file:// or locmem:// (default).
 CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-    }
-}
\ No newline at end of file
+    'default': cache_url.parse(
+        os.getenv("CACHE_URL"),
+        key_prefix=os.getenv("CACHE_KEY_PREFIX", "gamenews"),
+        base_dir=BASE_DIR,
+    )
+}
+
+# Stampede protection for core.cache: entries are recomputed early with
+# probability growing towards expiry (XFetch, scaled by CACHE_EARLY_BETA),
+# only one worker recomputes a key at a time and the rest serve the stale
+# copy kept for CACHE_STALE_GRACE extra seconds.
+CACHE_EARLY_BETA    = float(os.getenv("CACHE_EARLY_BETA", "1.0"))
+CACHE_STALE_GRACE   = int(os.getenv("CACHE_STALE_GRACE", "60"))
+CACHE_LOCK_TIMEOUT  = int(os.getenv("CACHE_LOCK_TIMEOUT", "10"))
+
+# Response cache TTLs in seconds (core.cache / news.views); writes invalidate
+# explicitly, so these only bound staleness from outside edits.
+NEWS_CACHE_TTLS = {
+    "api":        int(os.getenv("NEWS_CACHE_TTL_API", "30")),
+    "detail":     int(os.getenv("NEWS_CACHE_TTL_DETAIL", "60")),
+    "search":     int(os.getenv("NEWS_CACHE_TTL_SEARCH", "60")),
+    "categories": int(os.getenv("NEWS_CACHE_TTL_CATEGORIES", "600")),
+}
+
+# Conditional GET (core.conditional): JSON feeds are public with s-maxage so
+# a CDN can absorb anonymous traffic; HTML pages are private unless
+# HTTP_CACHE_PUBLIC_PAGES lets anonymous, cookie-less copies be shared.
+HTTP_CACHE_S_MAXAGE               = int(os.getenv("HTTP_CACHE_S_MAXAGE", "30"))
+HTTP_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("HTTP_CACHE_STALE_WHILE_REVALIDATE", "60"))
+HTTP_CACHE_PUBLIC_PAGES           = os.getenv("HTTP_CACHE_PUBLIC_PAGES", "False") == "True"
+
+# Author bylines (accounts.profiles): profiles live in the shared cache and,
+# briefly, in each process; settings_view invalidates both on change.
+PROFILE_CACHE_TTL        = int(os.getenv("PROFILE_CACHE_TTL", "3600"))
+PROFILE_LOCAL_CACHE_TTL  = int(os.getenv("PROFILE_LOCAL_CACHE_TTL", "30"))
+PROFILE_LOCAL_CACHE_SIZE = int(os.getenv("PROFILE_LOCAL_CACHE_SIZE", "2048"))
+
+# /news/api/search/ (news.search): "supabase" uses the search_news RPC and
+# its GIN index; "local" keeps an in-process index of the Django DB (dev).
+SEARCH_BACKEND   = os.getenv("SEARCH_BACKEND", "supabase")
+SEARCH_MAX_QUERY = int(os.getenv("SEARCH_MAX_QUERY", "200"))
+SEARCH_MAX_PAGE  = int(os.getenv("SEARCH_MAX_PAGE", "50"))
+
+# Buffered news.views increments (news.counters): flushed in one RPC every
+# interval seconds or threshold views; repeat views per session are ignored
+# for the dedupe window.
+NEWS_VIEWS_FLUSH_INTERVAL   = float(os.getenv("NEWS_VIEWS_FLUSH_INTERVAL", "10"))
+NEWS_VIEWS_FLUSH_THRESHOLD  = int(os.getenv("NEWS_VIEWS_FLUSH_THRESHOLD", "100"))
+NEWS_VIEWS_DEDUPE_WINDOW    = int(os.getenv("NEWS_VIEWS_DEDUPE_WINDOW", "1800"))
+
+# Required in the X-Cache-Stats-Token header for /news/api/cache-stats/
+# when DEBUG is off
+CACHE_STATS_TOKEN = os.getenv("CACHE_STATS_TOKEN")
+
+# Per-request Supabase call tracing (core.instrumentation): calls slower
+# than INSTRUMENTATION_SLOW_MS and query shapes repeated
+# INSTRUMENTATION_N_PLUS_ONE times in one request are logged as warnings.
+# Server-Timing exposes backend timings, so it follows DEBUG by default.
+INSTRUMENTATION_SLOW_MS       = float(os.getenv("INSTRUMENTATION_SLOW_MS", "500"))
+INSTRUMENTATION_N_PLUS_ONE    = int(os.getenv("INSTRUMENTATION_N_PLUS_ONE", "3"))
+INSTRUMENTATION_SERVER_TIMING = os.getenv("INSTRUMENTATION_SERVER_TIMING", str(DEBUG)) == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.instrumentation": {
+            "handlers": ["console"],
+            "level": os.getenv("INSTRUMENTATION_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
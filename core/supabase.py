@@ -1,13 +1,134 @@
-from supabase import create_client, Client
+import asyncio
+import threading
+import weakref
+from typing import TYPE_CHECKING
+
 from django.conf import settings
 
-def get_supabase_client() -> Client:
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+from core.instrumentation import instrumented_async_transport, instrumented_transport
+
+# supabase pulls in postgrest, auth, storage3, functions and realtime at
+# import time; it (and httpx) are imported on first use to keep cold starts
+# of requests served from cache or local JWT checks cheap.
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client, AsyncClient
+
+# Re-entrant: get_supabase_client() builds the client under the lock and
+# _build_client() takes it again through get_http_client().
+_lock          = threading.RLock()
+_http_client   = None
+_client        = None
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _pool_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_client() -> "httpx.Client":
+    """Process-wide httpx pool shared by every Supabase client.
+
+    Holds no auth headers of its own: postgrest, storage and auth send their
+    headers per request, so sharing the pool never shares a token.
+    """
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        with _lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    timeout=settings.SUPABASE_TIMEOUT,
+                    transport=instrumented_transport(
+                        http2=settings.SUPABASE_HTTP2,
+                        limits=_pool_limits(),
+                    ),
+                )
+    return _http_client
+
+
+def _build_client(access_token=None) -> "Client":
+    from supabase import create_client, ClientOptions
+
+    headers = {}
+    if access_token:
+        headers["Authorization"] = f"Bearer {access_token}"
+
+    return create_client(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_KEY,
+        options=ClientOptions(
+            headers=headers,
+            httpx_client=get_http_client(),
+            auto_refresh_token=False,
+            persist_session=False,
+        ),
+    )
+
+
+def get_supabase_client() -> "Client":
+    """Shared, thread-safe client for anonymous/service reads and writes."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def get_scoped_supabase_client(access_token=None) -> "Client":
+    """Per-request client for calls that carry or create a user session.
+
+    ``sign_in_with_password``/``sign_up`` rewrite the Authorization header of
+    the client they run on, so they must never run on the shared client.
+    The returned client still reuses the shared connection pool.
+    """
+    return _build_client(access_token)
+
+
+async def get_async_supabase_client() -> "AsyncClient":
+    """Async client for the running event loop (async views under ASGI).
+
+    httpx async pools are bound to the loop that created them, so one
+    client is kept per loop: a single shared pool under ASGI.
+    """
+    loop   = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+        from supabase import acreate_client, AsyncClientOptions
+
+        client = await acreate_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_KEY,
+            options=AsyncClientOptions(
+                httpx_client=httpx.AsyncClient(
+                    timeout=settings.SUPABASE_TIMEOUT,
+                    transport=instrumented_async_transport(
+                        http2=settings.SUPABASE_HTTP2,
+                        limits=_pool_limits(),
+                    ),
+                ),
+                auto_refresh_token=False,
+                persist_session=False,
+            ),
+        )
+        client = _async_clients.setdefault(loop, client)
+    return client
 
-# import os
-# from supabase import create_client, Client
 
-# def get_supabase() -> Client:
-#     url = os.environ.get("SUPABASE_URL")
-#     key = os.environ.get("SUPABASE_KEY")
-#     return create_client(url, key)
\ No newline at end of file
+def reset_supabase_client():
+    """Drop the shared client and close its pool (tests, benchmarks)."""
+    global _client, _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _client      = None
+        _http_client = None
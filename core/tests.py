@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import cache_url
+from core.uploads import UploadTooLarge, get_upload
+
+
+class SupabaseClientTests(SimpleTestCase):
+    def test_shared_client_builds_in_fresh_process(self):
+        # The first call builds the client and its pool under the same lock;
+        # run it where nothing has been built yet.
+        script = textwrap.dedent("""
+            import django
+            django.setup()
+            from core.supabase import get_supabase_client
+            assert get_supabase_client() is get_supabase_client()
+        """)
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "core.settings",
+            "SUPABASE_URL":           "http://127.0.0.1:54321",
+            "SUPABASE_KEY":           "test.test.test",
+            "DJANGO_SECRET_KEY":      "test-secret",
+        }
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+@override_settings(UPLOAD_MAX_BYTES=1024)
+class UploadLimitTests(SimpleTestCase):
+    def post(self, **files):
+        request = RequestFactory().post("/", {"title": "t", **files})
+        request.FILES  # parse the body through FILE_UPLOAD_HANDLERS
+        return request
+
+    def test_oversized_file_is_dropped_while_parsing(self):
+        request = self.post(image=SimpleUploadedFile("big.png", b"x" * 4096, "image/png"))
+
+        self.assertNotIn("image", request.FILES)
+        with self.assertRaises(UploadTooLarge):
+            get_upload(request, "image")
+
+    def test_file_within_limit_is_returned(self):
+        request = self.post(image=SimpleUploadedFile("small.png", b"x" * 512, "image/png"))
+
+        upload = get_upload(request, "image")
+        self.assertEqual(upload.read(), b"x" * 512)
+
+    def test_missing_file_is_none(self):
+        self.assertIsNone(get_upload(self.post(), "image"))
+
+    def test_only_the_oversized_field_is_rejected(self):
+        request = self.post(
+            image=SimpleUploadedFile("big.png", b"x" * 4096, "image/png"),
+            avatar=SimpleUploadedFile("small.png", b"x" * 10, "image/png"),
+        )
+
+        self.assertIsNotNone(get_upload(request, "avatar"))
+        with self.assertRaises(UploadTooLarge):
+            get_upload(request, "image")
+
+
+class CacheUrlTests(SimpleTestCase):
+    def test_default_is_locmem(self):
+        config = cache_url.parse(None, key_prefix="gamenews")
+        self.assertEqual(config["BACKEND"], cache_url.BACKENDS["locmem"])
+        self.assertEqual(config["LOCATION"], "unique-snowflake")
+        self.assertEqual(config["KEY_PREFIX"], "gamenews")
+
+    def test_locmem_name(self):
+        self.assertEqual(cache_url.parse("locmem://feed")["LOCATION"], "feed")
+
+    def test_redis_keeps_the_whole_url(self):
+        for url in ("redis://:secret@cache:6379/1", "rediss://cache.example.com:6380/0"):
+            config = cache_url.parse(url)
+            self.assertEqual(config["BACKEND"], cache_url.BACKENDS["redis"])
+            self.assertEqual(config["LOCATION"], url)
+
+    def test_memcached_servers(self):
+        config = cache_url.parse("memcached://mc1:11211,mc2:11211")
+        self.assertEqual(config["BACKEND"], cache_url.BACKENDS["memcached"])
+        self.assertEqual(config["LOCATION"], ["mc1:11211", "mc2:11211"])
+
+    def test_file_absolute_path(self):
+        self.assertEqual(cache_url.parse("file:///tmp/game-news-cache")["LOCATION"], "/tmp/game-news-cache")
+
+    def test_file_relative_path_uses_base_dir(self):
+        config = cache_url.parse("file://.cache/django", base_dir="/srv/app")
+        self.assertEqual(config["LOCATION"], "/srv/app/.cache/django")
+
+    def test_file_without_path_is_rejected(self):
+        with self.assertRaises(ValueError):
+            cache_url.parse("file://")
+
+    def test_dummy(self):
+        self.assertEqual(cache_url.parse("dummy://")["BACKEND"], cache_url.BACKENDS["dummy"])
+
+    def test_unknown_scheme_is_rejected(self):
+        with self.assertRaises(ValueError):
+            cache_url.parse("mongodb://localhost")
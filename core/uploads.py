@@ -0,0 +1,155 @@
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from core.supabase import get_http_client
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds settings.UPLOAD_MAX_BYTES."""
+
+    def __init__(self, limit=None):
+        limit = limit or settings.UPLOAD_MAX_BYTES
+        super().__init__(f"File is larger than {limit // (1024 * 1024)} MB")
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """First upload handler: drops a file as soon as it passes the size cap.
+
+    Runs while Django parses the request body, so an oversized file is never
+    buffered in memory or spooled to disk. The rejection is recorded on the
+    request and surfaced by ``get_upload``.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_BYTES:
+            rejected = getattr(self.request, "_rejected_uploads", set())
+            rejected.add(self.field_name)
+            self.request._rejected_uploads = rejected
+            raise SkipFile()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def get_upload(request, field_name):
+    """``request.FILES[field_name]`` or None; raises UploadTooLarge if cut off."""
+    upload = request.FILES.get(field_name)
+    if field_name in getattr(request, "_rejected_uploads", ()):
+        raise UploadTooLarge()
+    return upload
+
+
+def iter_chunks(fileobj, limit=None, chunk_size=CHUNK_SIZE):
+    """Yield ``fileobj`` in chunks, raising UploadTooLarge past ``limit``."""
+    limit = limit or settings.UPLOAD_MAX_BYTES
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+
+    sent = 0
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        sent += len(chunk)
+        if sent > limit:
+            raise UploadTooLarge(limit)
+        yield chunk
+
+
+class SupabaseStorage:
+    """Streams objects to Supabase Storage with a chunked request body."""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.base   = f"{settings.SUPABASE_URL}/storage/v1/object"
+
+    def upload(self, key, fileobj, content_type, cache_control=None, upsert=False):
+        headers = {
+            "apikey":        settings.SUPABASE_KEY,
+            "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+            "Content-Type":  content_type,
+            "x-upsert":      "true" if upsert else "false",
+        }
+        if cache_control:
+            headers["cache-control"] = f"max-age={cache_control}"
+
+        response = get_http_client().post(
+            f"{self.base}/{self.bucket}/{key}",
+            content=iter_chunks(fileobj),
+            headers=headers,
+        )
+        response.raise_for_status()
+
+    def delete(self, keys):
+        response = get_http_client().request(
+            "DELETE",
+            f"{self.base}/{self.bucket}",
+            json={"prefixes": list(keys)},
+            headers={
+                "apikey":        settings.SUPABASE_KEY,
+                "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+            },
+        )
+        response.raise_for_status()
+
+    def get_public_url(self, key):
+        return f"{self.base}/public/{self.bucket}/{key}"
+
+    def key_for_url(self, url):
+        prefix = self.get_public_url("")
+        return url[len(prefix):] if url and url.startswith(prefix) else None
+
+
+class LocalStorage:
+    """Stand-in for Supabase Storage writing under MEDIA_ROOT (dev, tests)."""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.root   = Path(settings.MEDIA_ROOT) / bucket
+
+    def upload(self, key, fileobj, content_type, cache_control=None, upsert=False):
+        path = self.root / key
+        if path.exists() and not upsert:
+            raise FileExistsError(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        partial = path.with_name(path.name + ".part")
+        try:
+            with open(partial, "wb") as out:
+                for chunk in iter_chunks(fileobj):
+                    out.write(chunk)
+            shutil.move(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+
+    def delete(self, keys):
+        for key in keys:
+            (self.root / key).unlink(missing_ok=True)
+
+    def get_public_url(self, key):
+        return f"{settings.MEDIA_URL}{self.bucket}/{key}"
+
+    def key_for_url(self, url):
+        prefix = self.get_public_url("")
+        return url[len(prefix):] if url and url.startswith(prefix) else None
+
+
+STORAGE_BACKENDS = {
+    "supabase": SupabaseStorage,
+    "local":    LocalStorage,
+}
+
+
+def get_storage(bucket="news_bucket"):
+    return STORAGE_BACKENDS[settings.UPLOAD_STORAGE](bucket)
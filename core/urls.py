@@ -14,19 +14,22 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('', include('todos.urls')),
     path('auth/', include('accounts.urls')),
     path('news/', include('news.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns += [path('admin/', admin.site.urls)]
+
 urlpatterns += [
     path(
         "favicon.ico",
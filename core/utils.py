@@ -1,4 +1,6 @@
 # core/utils.py
+import base64
+import json
 from datetime import datetime
 
 def parse_timestamp(timestamp_str):
@@ -17,4 +19,20 @@ def parse_supabase_data(data, *timestamp_fields):
             if data.get(field):
                 data[field] = parse_timestamp(data[field])
     
-    return data
\ No newline at end of file
+    return data
+
+def encode_cursor(values):
+    """Encode keyset pagination values as an opaque, URL-safe cursor"""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,60 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import render
+
+from accounts.decorator import supabase_auth_required
+from core.cache import acached
+from core.conditional import conditional_view
+from core.supabase import get_async_supabase_client
+from .counters import counts_views
+from .views import build_news_detail, news_detail_queries, news_update_response, with_detail_authors
+
+# Async twins of the slowest views, routed when served over ASGI (see
+# core/asgi.py). Independent Supabase queries run concurrently; templates
+# still render in a thread because context processors read the session.
+
+async def aload_news_detail(pk):
+    client = await get_async_supabase_client()
+    post_query, comments_query = news_detail_queries(client, pk)
+
+    post_res, comments_res = await asyncio.gather(
+        post_query.execute(),
+        comments_query.execute(),
+    )
+    return build_news_detail(post_res.data, comments_res.data)
+
+@counts_views
+@conditional_view(
+    "news_detail", lambda request, pk: [f"news:{pk}", "profiles"],
+    per_user=True, ttl=settings.NEWS_CACHE_TTLS["detail"],
+)
+async def news_detail(request, pk):
+    item, comments, comments_count = await acached(
+        "news_detail", [f"news:{pk}"], [str(pk)], settings.NEWS_CACHE_TTLS["detail"],
+        lambda: aload_news_detail(pk),
+    )
+    await sync_to_async(with_detail_authors)(item, comments)
+
+    return await sync_to_async(render)(
+        request,
+        "detail.html",
+        {
+            "item": item,
+            "comments": comments,
+            "comments_count": comments_count,
+        },
+    )
+
+@supabase_auth_required
+async def news_update(request, pk):
+    user_id = request.supabase_user.id
+    client  = await get_async_supabase_client()
+
+    res, categories = await asyncio.gather(
+        client.table("news").select("*").eq("id", str(pk)).single().execute(),
+        client.table("categories").select("*").execute(),
+    )
+
+    return await sync_to_async(news_update_response)(request, pk, user_id, res.data, categories)
@@ -0,0 +1,154 @@
+import html
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+# What the Quill toolbars produce (plus a little headroom for older posts).
+ALLOWED_TAGS = {
+    "p", "br", "strong", "b", "em", "i", "u", "s", "a", "ul", "ol", "li",
+    "blockquote", "pre", "code", "h1", "h2", "h3", "img", "span",
+}
+VOID_TAGS  = {"br", "img"}
+BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "blockquote", "pre"}
+# Dropped together with everything inside them
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "template", "noscript", "svg", "math"}
+
+ALLOWED_ATTRS = {
+    "a":   {"href", "title"},
+    "img": {"src", "alt"},
+}
+# Quill's alignment/indent/list classes only
+CLASS_RE = re.compile(r"^ql-[a-z0-9-]+$")
+
+LINK_SCHEMES  = {"http", "https", "mailto"}
+IMAGE_SCHEMES = {"http", "https"}
+DATA_IMAGE_RE = re.compile(r"^data:image/(png|jpeg|gif|webp);base64,[a-z0-9+/=\s]+$", re.IGNORECASE)
+
+EXCERPT_LENGTH   = 280
+WORDS_PER_MINUTE  = 200
+
+
+def _safe_url(value, schemes, allow_data_image=False):
+    value = (value or "").strip()
+    if allow_data_image and DATA_IMAGE_RE.match(value):
+        return value
+    scheme = urlsplit(value).scheme.lower()
+    if scheme and scheme not in schemes:
+        return None
+    # Relative links are fine; "javascript:" hidden behind whitespace is not
+    if not scheme and ":" in value.split("/", 1)[0]:
+        return None
+    return value
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out         = []
+        self.text        = []
+        self.open        = []
+        self.skip_depth  = 0
+        self.first_image = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth or tag not in ALLOWED_TAGS:
+            return
+
+        # <p> and <li> end implicitly when a sibling starts
+        if tag in ("p", "li") and self.open and self.open[-1] == tag:
+            self.handle_endtag(tag)
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+
+        kept = []
+        for name, value in attrs:
+            if name == "class":
+                classes = " ".join(c for c in (value or "").split() if CLASS_RE.match(c))
+                if classes:
+                    kept.append(("class", classes))
+            elif name in ALLOWED_ATTRS.get(tag, ()):
+                if name == "href":
+                    value = _safe_url(value, LINK_SCHEMES)
+                elif name == "src":
+                    value = _safe_url(value, IMAGE_SCHEMES, allow_data_image=True)
+                if value is not None:
+                    kept.append((name, value))
+
+        if tag == "img":
+            src = dict(kept).get("src")
+            if not src:
+                return
+            if self.first_image is None and not src.startswith("data:"):
+                self.first_image = src
+            kept.append(("loading", "lazy"))
+        if tag == "a":
+            kept.append(("rel", "nofollow noopener noreferrer"))
+
+        rendered = "".join(f' {name}="{html.escape(value, quote=True)}"' for name, value in kept)
+        self.out.append(f"<{tag}{rendered}>")
+        if tag not in VOID_TAGS:
+            self.open.append(tag)
+        elif tag == "br":
+            self.text.append(" ")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and tag in self.open and not self.skip_depth:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag not in self.open:
+            return
+        # Close anything left open inside this tag first
+        while self.open:
+            current = self.open.pop()
+            self.out.append(f"</{current}>")
+            if current == tag:
+                break
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.out.append(html.escape(data, quote=False))
+        self.text.append(data)
+
+    def result(self):
+        self.close()
+        while self.open:
+            self.out.append(f"</{self.open.pop()}>")
+        return "".join(self.out), " ".join("".join(self.text).split())
+
+
+def excerpt(text, length=EXCERPT_LENGTH):
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0]
+    return cut.rstrip(",.;:!?") + "…"
+
+
+def prepare_content(raw):
+    """Sanitize post HTML once, at write time, and derive the feed columns.
+
+    Returns the values to store: ``content`` (allowlisted HTML),
+    ``excerpt`` (plain text), ``reading_time`` (minutes) and
+    ``first_image_url`` (first non-inline image, or None).
+    """
+    parser = _Sanitizer()
+    parser.feed(raw or "")
+    content, text = parser.result()
+
+    words = len(text.split())
+    return {
+        "content":         content,
+        "excerpt":         excerpt(text),
+        "reading_time":    max(1, round(words / WORDS_PER_MINUTE)),
+        "first_image_url": parser.first_image,
+    }
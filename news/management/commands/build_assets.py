@@ -0,0 +1,112 @@
+import platform
+import posixpath
+import re
+import stat
+import subprocess
+from urllib.parse import urljoin
+
+import httpx
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+ASSETS_DIR = settings.BASE_DIR / "assets"
+
+# Pinned front-end dependencies, vendored under assets/vendor/ so pages make
+# no third-party requests. Files referenced from a stylesheet with url()
+# (icon fonts) are fetched alongside it.
+VENDOR = {
+    "vendor/alpine/alpine.min.js":        "https://cdn.jsdelivr.net/npm/alpinejs@3.15.0/dist/cdn.min.js",
+    "vendor/fontawesome/css/all.min.css": "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/7.0.1/css/all.min.css",
+    "vendor/quill/quill.min.js":          "https://cdn.jsdelivr.net/npm/quill@1.3.7/dist/quill.min.js",
+    "vendor/quill/quill.snow.css":        "https://cdn.jsdelivr.net/npm/quill@1.3.7/dist/quill.snow.css",
+}
+
+CSS_URL_RE = re.compile(r"""url\(\s*['"]?([^'")]+)['"]?\s*\)""")
+
+# The input lives outside STATICFILES_DIRS: collectstatic would try to
+# resolve its `@import "tailwindcss"` as a file.
+TAILWIND_INPUT  = settings.BASE_DIR / "core" / "tailwind.css"
+TAILWIND_OUTPUT = ASSETS_DIR / "css" / "app.css"
+TAILWIND_CACHE  = settings.BASE_DIR / ".cache"
+TAILWIND_URL    = "https://github.com/tailwindlabs/tailwindcss/releases/download/v{version}/tailwindcss-{target}"
+
+
+def tailwind_target():
+    system = {"Linux": "linux", "Darwin": "macos", "Windows": "windows"}.get(platform.system())
+    arch   = {"x86_64": "x64", "amd64": "x64", "arm64": "arm64", "aarch64": "arm64"}.get(platform.machine().lower())
+    if not system or not arch:
+        raise CommandError(
+            f"No Tailwind standalone build for {platform.system()} {platform.machine()}; set TAILWIND_CLI"
+        )
+    return f"{system}-{arch}.exe" if system == "windows" else f"{system}-{arch}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile the Tailwind classes used in the templates into assets/css/app.css "
+        "and vendor the pinned JS/CSS dependencies into assets/vendor/. Deploys run "
+        "it through build_files.sh; run it once locally before serving pages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--skip-vendor", action="store_true", help="only rebuild the stylesheet")
+        parser.add_argument("--collectstatic", action="store_true", help="run collectstatic afterwards")
+
+    def handle(self, *args, skip_vendor, collectstatic, **options):
+        with httpx.Client(follow_redirects=True, timeout=60) as client:
+            if not skip_vendor:
+                for path, url in VENDOR.items():
+                    self.vendor(client, path, url)
+            cli = settings.TAILWIND_CLI or self.download_tailwind(client)
+
+        TAILWIND_OUTPUT.parent.mkdir(parents=True, exist_ok=True)
+        result = subprocess.run(
+            [str(cli), "--input", str(TAILWIND_INPUT), "--output", str(TAILWIND_OUTPUT), "--minify"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Tailwind build failed:\n{result.stderr}")
+        self.stdout.write(f"Compiled {TAILWIND_OUTPUT.relative_to(settings.BASE_DIR)} "
+                          f"({TAILWIND_OUTPUT.stat().st_size} bytes)")
+
+        if collectstatic:
+            call_command("collectstatic", interactive=False, verbosity=options["verbosity"])
+        self.stdout.write(self.style.SUCCESS("Assets built"))
+
+    def fetch(self, client, url):
+        try:
+            response = client.get(url)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise CommandError(f"Could not download {url}: {e}")
+        return response.content
+
+    def vendor(self, client, path, url):
+        body = self.fetch(client, url)
+        self.write(path, body)
+
+        if path.endswith(".css"):
+            # Fonts and images the stylesheet points at; the manifest storage
+            # refuses to hash a stylesheet whose references are missing.
+            refs = {ref.split("#")[0].split("?")[0] for ref in CSS_URL_RE.findall(body.decode())}
+            for ref in sorted(refs):
+                if not ref or ref.startswith(("data:", "http:", "https:", "/")):
+                    continue
+                target = posixpath.normpath(posixpath.join(posixpath.dirname(path), ref))
+                self.write(target, self.fetch(client, urljoin(url, ref)))
+
+    def write(self, path, body):
+        dest = ASSETS_DIR / path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_bytes(body)
+        self.stdout.write(f"Vendored assets/{path}")
+
+    def download_tailwind(self, client):
+        target = tailwind_target()
+        cli    = TAILWIND_CACHE / f"tailwindcss-{settings.TAILWIND_VERSION}-{target}"
+        if not cli.exists():
+            cli.parent.mkdir(parents=True, exist_ok=True)
+            cli.write_bytes(self.fetch(client, TAILWIND_URL.format(version=settings.TAILWIND_VERSION, target=target)))
+            cli.chmod(cli.stat().st_mode | stat.S_IXUSR)
+        return cli
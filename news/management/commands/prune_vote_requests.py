@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.supabase import get_supabase_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete handle_votes_batch idempotency keys older than --hours via the "
+        "prune_vote_requests RPC. Clients only retry within seconds, so old keys "
+        "are dead weight; run this daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24)
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--max-batches", type=int, default=100)
+
+    def handle(self, *args, hours, batch_size, max_batches, **options):
+        client = get_supabase_client()
+        total  = 0
+        for _ in range(max_batches):
+            deleted = client.rpc("prune_vote_requests", {
+                "p_older_than": f"{hours} hours",
+                "p_limit":      batch_size,
+            }).execute().data or 0
+            total += deleted
+            if deleted < batch_size:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Pruned {total} vote keys"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.supabase import get_supabase_client
+from news.content import prepare_content
+from news.views import invalidate_news
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-sanitize every post body and rebuild its excerpt, reading time and "
+        "first image. New and edited posts get these at write time; run this "
+        "after applying the schema or changing news/content.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, batch_size, **options):
+        client  = get_supabase_client()
+        last_id = None
+        total   = 0
+        while True:
+            query = client.table("news").select("id, content").order("id").limit(batch_size)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = query.execute().data or []
+
+            for row in rows:
+                client.table("news").update(prepare_content(row["content"])).eq("id", row["id"]).execute()
+                invalidate_news(row["id"])
+            total += len(rows)
+
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1]["id"]
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt content for {total} posts"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.supabase import get_supabase_client
+from news.views import invalidate_feed
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute stale hot/best scores in batches via the refresh_news_scores RPC. "
+        "Votes and views keep scores current through a trigger; run this after "
+        "applying the schema (backfill) or changing the score formulas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--max-batches", type=int, default=100)
+
+    def handle(self, *args, batch_size, max_batches, **options):
+        client = get_supabase_client()
+        total  = 0
+        for _ in range(max_batches):
+            updated = client.rpc("refresh_news_scores", {"p_limit": batch_size}).execute().data or 0
+            total  += updated
+            if updated < batch_size:
+                break
+
+        if total:
+            invalidate_feed()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed scores for {total} posts"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from news.views import NEWS_SORTS, feed_page, get_categories
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the cache with the first feed page of every category x filter "
+        "combination (plus the unfiltered feed). Pages already cached under the "
+        "current feed version are left alone, so this is cheap to run from cron."
+    )
+
+    def handle(self, *args, **options):
+        categories = [None] + [str(c["id"]) for c in get_categories()]
+        for category in categories:
+            for filter_type in NEWS_SORTS:
+                feed_page(filter_type, category=category)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {len(categories) * len(NEWS_SORTS)} feed pages"
+        ))
@@ -1,6 +1,5 @@
 # Generated by Django 6.0.2 on 2026-02-08 05:06
 
-import ckeditor.fields
 from django.db import migrations, models
 
 
@@ -17,7 +16,7 @@ class Migration(migrations.Migration):
             fields=[
                 ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
                 ('title', models.TextField()),
-                ('content', ckeditor.fields.RichTextField()),
+                ('content', models.TextField()),
                 ('created_at', models.DateTimeField(auto_now_add=True)),
                 ('updated_at', models.DateTimeField(auto_now=True)),
             ],
@@ -0,0 +1,190 @@
+import html
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+from accounts.profiles import MISSING, get_profiles
+from core.cache import get_version
+from core.supabase import get_supabase_client
+
+TAG_RE   = re.compile(r"<[^>]*>")
+WORD_RE  = re.compile(r"\w+", re.UNICODE)
+
+# Title matches count like Postgres weight A vs B in the search_news RPC
+TITLE_WEIGHT = 2.0
+SNIPPET_WORDS = 35
+
+INDEX_FIELDS     = "id, title, content, image_url, votes, views, created_at, author_id"
+INDEX_BATCH_SIZE = 1000
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or "
+    "that the this to was were will with".split()
+)
+
+
+def strip_tags(content):
+    return html.unescape(TAG_RE.sub(" ", content or ""))
+
+
+def tokenize(text):
+    return [t for t in WORD_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def safe_snippet(snippet):
+    """Escape a ``<mark>``-highlighted snippet, keeping only the marks."""
+    return (
+        html.escape(snippet or "", quote=False)
+        .replace("&lt;mark&gt;", "<mark>")
+        .replace("&lt;/mark&gt;", "</mark>")
+    )
+
+
+class SupabaseSearch:
+    """Ranked search via the ``search_news`` RPC (tsvector + GIN index)."""
+
+    def search(self, query, limit, offset):
+        res = get_supabase_client().rpc("search_news", {
+            "p_query":  query,
+            "p_limit":  limit,
+            "p_offset": offset,
+        }).execute()
+
+        results = res.data or []
+        for item in results:
+            item["snippet"] = safe_snippet(item.get("snippet"))
+        return results
+
+
+class LocalSearch:
+    """In-process inverted index over the ``news`` table (dev, tests).
+
+    Reads posts through the Supabase client, so it works against any
+    PostgREST, including benchmarks.fake_supabase, without the
+    ``search_news`` RPC. Built on first use and rebuilt whenever the
+    ``feed`` cache namespace is bumped, i.e. after any post is created,
+    edited or deleted. Queries only touch the postings of their own terms,
+    so they do not scan every post.
+    """
+
+    def __init__(self):
+        self._lock     = threading.Lock()
+        self._version  = None
+        self._docs     = {}
+        self._postings = {}
+
+    def _rows(self):
+        client  = get_supabase_client()
+        rows    = []
+        last_id = None
+        while True:
+            query = client.table("news").select(INDEX_FIELDS).order("id").limit(INDEX_BATCH_SIZE)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            batch = query.execute().data or []
+            rows.extend(batch)
+
+            if len(batch) < INDEX_BATCH_SIZE:
+                return rows
+            last_id = batch[-1]["id"]
+
+    def _build(self):
+        rows     = self._rows()
+        profiles = get_profiles(row.get("author_id") for row in rows)
+        docs     = {}
+        postings = defaultdict(dict)
+
+        for row in rows:
+            doc_id = str(row["id"])
+            text   = strip_tags(row.pop("content"))
+
+            weights = defaultdict(float)
+            for term in tokenize(row["title"]):
+                weights[term] += TITLE_WEIGHT
+            for term in tokenize(text):
+                weights[term] += 1.0
+            for term, weight in weights.items():
+                postings[term][doc_id] = weight
+
+            profile = profiles.get(str(row["author_id"])) or MISSING
+            row.update(
+                id=doc_id,
+                author_id=str(row["author_id"]),
+                author_username=profile.get("username") or "Unknown",
+            )
+            docs[doc_id] = (row, text)
+
+        return docs, dict(postings)
+
+    def _index(self):
+        version = get_version("feed")
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._docs, self._postings = self._build()
+                    self._version = version
+        return self._docs, self._postings
+
+    def search(self, query, limit, offset):
+        docs, postings = self._index()
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        # Every term must match, like websearch_to_tsquery's implicit AND
+        matches = [postings.get(term, {}) for term in terms]
+        matches.sort(key=len)
+        candidates = set(matches[0]).intersection(*matches[1:])
+
+        total  = len(docs) or 1
+        scores = {}
+        for doc_id in candidates:
+            scores[doc_id] = sum(
+                (1 + math.log(postings[term][doc_id])) * math.log(1 + total / len(postings[term]))
+                for term in terms
+            )
+
+        ranked = sorted(
+            candidates,
+            key=lambda doc_id: (scores[doc_id], docs[doc_id][0]["created_at"] or ""),
+            reverse=True,
+        )
+
+        results = []
+        for doc_id in ranked[offset:offset + limit]:
+            row, text = docs[doc_id]
+            results.append({**row, "rank": round(scores[doc_id], 6), "snippet": self._snippet(text, terms)})
+        return results
+
+    def _snippet(self, text, terms):
+        words = text.split()
+        first = next(
+            (i for i, word in enumerate(words) if set(tokenize(word)) & terms),
+            0,
+        )
+        start  = max(0, first - SNIPPET_WORDS // 3)
+        window = words[start:start + SNIPPET_WORDS]
+
+        marked = []
+        for word in window:
+            escaped = html.escape(word, quote=False)
+            marked.append(f"<mark>{escaped}</mark>" if set(tokenize(word)) & terms else escaped)
+        return " ".join(marked)
+
+
+SEARCH_BACKENDS = {
+    "supabase": SupabaseSearch,
+    "local":    LocalSearch,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        _backend = SEARCH_BACKENDS[settings.SEARCH_BACKEND]()
+    return _backend
@@ -0,0 +1,10 @@
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def srcset(renditions, fmt="webp"):
+    """Build a ``srcset`` value from an ``image_renditions`` map."""
+    urls = (renditions or {}).get(fmt) or {}
+    return ", ".join(f"{url} {width}w" for width, url in sorted(urls.items(), key=lambda i: int(i[0])))
@@ -1,3 +1,296 @@
-from django.test import TestCase
+import io
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from benchmarks.fake_supabase import FakeSupabaseServer
+from core.supabase import reset_supabase_client
+from core.images import NEWS_IMAGE_WIDTHS, ImageProcessingError, delete_image, upload_image
+from core.utils import encode_cursor
+from news import search
+from news.views import NEWS_PAGE_SIZE, _validate_vote, keyset_filter, parse_cursor
+
+
+def png_upload(width=800, height=600, name="photo.png"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+class NewsImageUploadTests(SimpleTestCase):
+    """Uploads go through core.uploads.LocalStorage instead of Supabase."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = Path(media.name)
+
+        overrides = override_settings(UPLOAD_STORAGE="local", MEDIA_ROOT=media.name, MEDIA_URL="/media/")
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def stored_path(self, url):
+        return self.media_root / url[len("/media/"):]
+
+    def test_renditions_are_stored_per_width_and_format(self):
+        image_url, renditions = upload_image(png_upload(), "news")
+
+        self.assertEqual(set(renditions), {"webp", "jpeg"})
+        for urls in renditions.values():
+            self.assertEqual(set(urls), {str(width) for width in NEWS_IMAGE_WIDTHS if width <= 800} | {"800"})
+            for url in urls.values():
+                self.assertTrue(self.stored_path(url).is_file(), url)
+        self.assertEqual(image_url, renditions["jpeg"]["800"])
+
+    def test_small_images_are_not_upscaled(self):
+        _, renditions = upload_image(png_upload(200, 100), "news")
+
+        self.assertEqual(list(renditions["webp"]), ["200"])
+        with Image.open(self.stored_path(renditions["jpeg"]["200"])) as stored:
+            self.assertEqual(stored.size, (200, 100))
+
+    def test_delete_image_removes_every_rendition(self):
+        _, renditions = upload_image(png_upload(), "news")
+
+        delete_image(renditions)
+
+        for urls in renditions.values():
+            for url in urls.values():
+                self.assertFalse(self.stored_path(url).exists(), url)
+
+    def test_not_an_image_is_rejected(self):
+        with self.assertRaises(ImageProcessingError):
+            upload_image(SimpleUploadedFile("notes.png", b"not an image", "image/png"), "news")
+
+    @override_settings(IMAGE_MAX_PIXELS=1000)
+    def test_pixel_cap_is_checked_before_decoding(self):
+        with self.assertRaises(ImageProcessingError):
+            upload_image(png_upload(), "news")
+        self.assertFalse(any(self.media_root.rglob("*.*")))
+
+
+class CursorTests(SimpleTestCase):
+    def setUp(self):
+        self.id = str(uuid.uuid4())
+
+    def test_valid_cursors_round_trip(self):
+        self.assertEqual(
+            parse_cursor("new", encode_cursor(["2026-01-01T10:00:00+00:00", self.id])),
+            ["2026-01-01T10:00:00+00:00", self.id],
+        )
+        self.assertEqual(parse_cursor("hot", encode_cursor([12.5, self.id])), [12.5, self.id])
+
+    def test_values_of_the_wrong_type_are_rejected(self):
+        bad = [
+            ("new", ["yesterday", self.id]),
+            ("new", ["2026-01-01T10:00:00", 'x",id.gt.0']),
+            ("top", [{"votes": 1}, self.id]),
+            ("top", [[1], self.id]),
+            ("top", [True, self.id]),
+            ("best", ["1.0", self.id]),
+            ("hot", [1.0]),
+        ]
+        for filter_type, values in bad:
+            with self.subTest(filter_type=filter_type, values=values):
+                with self.assertRaises(ValueError):
+                    parse_cursor(filter_type, encode_cursor(values))
+
+    def test_garbage_is_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_cursor("new", "not-a-cursor!")
+
+    def test_filter_quotes_and_escapes_strings(self):
+        self.assertEqual(
+            keyset_filter(("created_at", "id"), ['a\\"b', self.id]),
+            f'created_at.lt."a\\\\\\"b",and(created_at.eq."a\\\\\\"b",id.lt."{self.id}")',
+        )
+
+
+def news_row(title, content, day=1, **fields):
+    return {
+        "id":          str(uuid.uuid4()),
+        "title":       title,
+        "content":     content,
+        "image_url":   None,
+        "category_id": None,
+        "votes":       0,
+        "views":       0,
+        "created_at":  f"2026-01-{day:02d}T10:00:00+00:00",
+        "author_id":   "author-1",
+        **fields,
+    }
+
+
+class NewsSearchTests(SimpleTestCase):
+    """news_search on the local index, read from benchmarks.fake_supabase."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.title_hit = news_row("Zelda patch notes", "<p>Balance changes.</p>", day=1)
+        cls.body_hit  = news_row("Weekly roundup", "<p>A <b>zelda</b> patch is out.</p>", day=2)
+        cls.other     = news_row("Mario kart", "<p>New tracks.</p>", day=3)
+        cls.paged     = [news_row(f"Speedrun {i}", "<p>speedrun record</p>", day=i + 1) for i in range(NEWS_PAGE_SIZE + 2)]
+
+        cls.server = FakeSupabaseServer({
+            "news":     [cls.title_hit, cls.body_hit, cls.other, *cls.paged],
+            "profiles": [{"id": "author-1", "username": "writer", "avatar_url": None}],
+        }).start()
+        cls.addClassCleanup(cls.server.stop)
+
+    def setUp(self):
+        overrides = override_settings(SUPABASE_URL=self.server.url, SEARCH_BACKEND="local")
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        reset_supabase_client()
+        self.addCleanup(reset_supabase_client)
+        search._backend = None
+        self.addCleanup(setattr, search, "_backend", None)
+        cache.clear()
+
+    def search(self, **params):
+        return self.client.get("/news/api/search/", params)
+
+    def test_title_matches_rank_above_body_matches(self):
+        response = self.search(q="zelda patch")
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([r["id"] for r in results], [self.title_hit["id"], self.body_hit["id"]])
+        self.assertEqual(results[0]["author_username"], "writer")
+        self.assertIn("<mark>zelda</mark>", results[1]["snippet"])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search(q="zelda kart").json()["results"], [])
+
+    def test_empty_query_is_rejected(self):
+        for q in ("", "   "):
+            with self.subTest(q=q):
+                self.assertEqual(self.search(q=q).status_code, 400)
+
+    def test_stopword_only_query_has_no_results(self):
+        self.assertEqual(self.search(q="the").json()["results"], [])
+
+    def test_pages(self):
+        first  = self.search(q="speedrun").json()
+        second = self.search(q="speedrun", page=2).json()
+
+        self.assertEqual(len(first["results"]), NEWS_PAGE_SIZE)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(second["results"]), 2)
+        self.assertFalse(second["has_more"])
+
+        seen = [r["id"] for r in first["results"] + second["results"]]
+        self.assertCountEqual(seen, [row["id"] for row in self.paged])
+
+    def test_out_of_range_pages_are_rejected(self):
+        for page in ("0", "abc", str(10 ** 6)):
+            with self.subTest(page=page):
+                self.assertEqual(self.search(q="speedrun", page=page).status_code, 400)
+
+
+VOTE_JWT_SECRET = "vote-tests-jwt-secret-at-least-32-bytes"
+
+
+class VoteBatchTests(SimpleTestCase):
+    """votes_batch against benchmarks.fake_supabase, signed in as one user."""
+
+    def setUp(self):
+        self.post   = news_row("Zelda patch notes", "<p>Balance changes.</p>")
+        self.server = FakeSupabaseServer({
+            "news":     [self.post],
+            "profiles": [{"id": "author-1", "username": "writer", "avatar_url": None}],
+            "users":    [{"id": str(uuid.uuid4()), "email": "voter@example.com", "password": "voter-password"}],
+        }, jwt_secret=VOTE_JWT_SECRET).start()
+        self.addCleanup(self.server.stop)
+
+        overrides = override_settings(SUPABASE_URL=self.server.url, SUPABASE_JWT_SECRET=VOTE_JWT_SECRET)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        reset_supabase_client()
+        self.addCleanup(reset_supabase_client)
+
+        response = self.client.post("/auth/login", {"email": "voter@example.com", "password": "voter-password"})
+        self.assertEqual(response.status_code, 302)
+
+    def vote(self, value):
+        response = self.client.post(
+            "/news/api/votes/",
+            {"votes": [{"target": "news", "id": self.post["id"], "value": value, "key": uuid.uuid4().hex}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"][0]
+
+    def test_zero_takes_the_vote_back(self):
+        self.assertEqual(self.vote(1)["votes"], 1)
+
+        result = self.vote(0)
+        self.assertNotIn("error", result)
+        self.assertEqual(result["votes"], 0)
+
+    def test_other_values_are_rejected(self):
+        for value in (2, -2, "1", None):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    _validate_vote({"target": "news", "id": self.post["id"], "value": value, "key": "k"}),
+                    "Value must be 1, -1 or 0",
+                )
+
+
+@override_settings(STORAGES={
+    "default":     {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class NewsDetailConditionalTests(SimpleTestCase):
+    """news_detail revalidation against benchmarks.fake_supabase."""
+
+    def setUp(self):
+        self.post   = news_row("Zelda patch notes", "<p>Balance changes.</p>")
+        self.server = FakeSupabaseServer({
+            "news":     [self.post],
+            "comments": [],
+            "profiles": [{"id": "author-1", "username": "writer", "avatar_url": None}],
+        }).start()
+        self.addCleanup(self.server.stop)
+
+        overrides = override_settings(SUPABASE_URL=self.server.url)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        reset_supabase_client()
+        self.addCleanup(reset_supabase_client)
+        cache.clear()
+
+        patcher = mock.patch("news.counters.view_counter")
+        self.view_counter = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, viewer, **headers):
+        return self.client.get(f"/news/{self.post['id']}/", REMOTE_ADDR=viewer, **headers)
+
+    def test_revalidation_is_counted_as_a_view(self):
+        first = self.get("10.0.0.1")
+        self.assertEqual(first.status_code, 200)
+
+        again = self.get("10.0.0.2", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(self.view_counter.record.call_count, 2)
+
+    def test_validators_expire_with_the_cached_page(self):
+        etag = self.get("10.0.0.1")["ETag"]
+
+        later = time.time() + settings.NEWS_CACHE_TTLS["detail"] + 1
+        with mock.patch("core.conditional.time.time", return_value=later):
+            response = self.get("10.0.0.1", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
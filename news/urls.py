@@ -1,16 +1,24 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# ASGI serves the async views (concurrent Supabase queries), WSGI the sync ones
+detail_view = async_views.news_detail if settings.ASYNC_VIEWS else views.news_detail
+update_view = async_views.news_update if settings.ASYNC_VIEWS else views.news_update
 
 urlpatterns = [
     path('', views.news_list, name='news_list'),
     path('create/', views.news_create, name='news_create'),
-    path("<uuid:pk>/", views.news_detail, name="news_detail"),
-    path('edit/<uuid:pk>/', views.news_update, name='news_update'),
+    path("<uuid:pk>/", detail_view, name="news_detail"),
+    path('edit/<uuid:pk>/', update_view, name='news_update'),
     path('delete/<uuid:pk>/', views.news_delete, name='news_delete'),
 
     path("api/", views.news_api, name="news_api"),
     path("api/create/", views.news_api_create, name="news_api_create"),
+    path("api/search/", views.news_search, name="news_search"),
     path("api/<uuid:pk>/vote/", views.news_vote, name="news_vote"),
     path("<uuid:pk>/comment/", views.comment_create, name="comment_create"),
     path("api/comment/<uuid:comment_id>/vote/", views.comment_vote, name="comment_vote"),
+    path("api/votes/", views.votes_batch, name="votes_batch"),
+    path("api/cache-stats/", views.news_cache_stats, name="news_cache_stats"),
 ]
\ No newline at end of file
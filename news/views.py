@@ -1,124 +1,261 @@
+import math
 import uuid
+from datetime import datetime
 from django.http import Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from .models import News
 from .forms import NewsForm
+from .counters import counts_views
+from .search import get_search_backend
+from .content import prepare_content
+from django.conf import settings
 from core.supabase import get_supabase_client
-from datetime import datetime
+from core.images import delete_image, upload_image, ImageProcessingError
+from core.uploads import get_upload, UploadTooLarge
+from core.cache import bump_version, cached, cache_stats
+from core.conditional import conditional_view
 from accounts.decorator import supabase_auth_required
-from core.utils import parse_supabase_data
+from accounts.profiles import attach_authors
+from core.utils import parse_supabase_data, encode_cursor, decode_cursor
+
+# Cache namespaces: "feed" covers news_list/news_api pages, "news:<pk>"
+# covers one post's detail page. Writes bump the namespaces they touch.
+CACHED_VIEWS = ("news_api", "news_detail", "news_search")
+
+def invalidate_feed():
+    bump_version("feed")
+
+def invalidate_news(pk):
+    bump_version("feed", f"news:{pk}")
+
+def invalidate_comments(news_id):
+    bump_version(f"news:{news_id}")
+
+# Votes only touch the post's own page. Feed pages pick up new counts (and
+# the trigger-maintained hot/best order) when their short TTL expires, so a
+# vote does not discard every warmed feed page and the search index.
+def invalidate_votes(pk):
+    bump_version(f"news:{pk}")
+
+# Keyset sort columns per feed filter, all descending; ``id`` breaks ties.
+# ``hot_score``/``best_score`` are maintained by a trigger on news (see
+# assets/schema.sql and the refresh_news_scores command).
+NEWS_SORTS = {
+    "new":  ("created_at", "id"),
+    "top":  ("votes", "id"),
+    "hot":  ("hot_score", "id"),
+    "best": ("best_score", "id"),
+}
+
+# Feed cards never need the full body: ``excerpt``, ``reading_time`` and
+# ``first_image_url`` are derived from it at write time (news.content).
+# Authors come from the profile cache (accounts.profiles), not an embed.
+NEWS_FEED_COLUMNS = "id, title, excerpt, reading_time, first_image_url, image_url, image_renditions, category_id, votes, views, hot_score, best_score, created_at, author_id"
+NEWS_PAGE_SIZE    = 10
+
+# Up, down, or 0 to take the user's vote back (the vote toggles send it)
+VOTE_VALUES = (1, -1, 0)
+
+def _cursor_number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError("Invalid cursor")
+    return value
+
+def _cursor_timestamp(value):
+    if not isinstance(value, str):
+        raise ValueError("Invalid cursor")
+    return datetime.fromisoformat(value).isoformat()
+
+def _cursor_uuid(value):
+    if not isinstance(value, str):
+        raise ValueError("Invalid cursor")
+    return str(uuid.UUID(value))
+
+# Cursor values end up inside a PostgREST filter string, so each one is
+# checked against its column's type (and re-serialised) before use.
+CURSOR_TYPES = {
+    "created_at": _cursor_timestamp,
+    "id":         _cursor_uuid,
+    "votes":      _cursor_number,
+    "hot_score":  _cursor_number,
+    "best_score": _cursor_number,
+}
+
+def parse_cursor(filter_type, cursor):
+    """Decoded, type-checked keyset values for ``filter_type``; ValueError if invalid."""
+    values  = decode_cursor(cursor)
+    columns = NEWS_SORTS[filter_type]
+    if len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    return [CURSOR_TYPES[column](value) for column, value in zip(columns, values)]
+
+def _filter_value(value):
+    if isinstance(value, str):
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return str(value)
+
+def keyset_filter(columns, values):
+    """PostgREST ``or`` filter selecting rows strictly after ``values``."""
+    clauses = []
+    for i, column in enumerate(columns):
+        terms = [f"{c}.eq.{_filter_value(v)}" for c, v in zip(columns[:i], values[:i])]
+        terms.append(f"{column}.lt.{_filter_value(values[i])}")
+        clauses.append(terms[0] if len(terms) == 1 else f"and({','.join(terms)})")
+    return ",".join(clauses)
+
+def fetch_news_page(filter_type, cursor_values=None, page=1, page_size=NEWS_PAGE_SIZE, category=None):
+    """Fetch one feed page; returns the rows and the cursor of the next page.
+
+    With ``cursor_values`` the page is selected by keyset, otherwise by
+    ``page`` offset (kept for older clients). One extra row is fetched in
+    place of a count query to tell whether another page exists.
+    ``category`` narrows the feed to one category id.
+    """
+    columns = NEWS_SORTS[filter_type]
+    query   = get_supabase_client().table("news").select(NEWS_FEED_COLUMNS)
+
+    if category:
+        query = query.eq("category_id", category)
+
+    for column in columns:
+        query = query.order(column, desc=True)
+
+    if cursor_values:
+        res = query.or_(keyset_filter(columns, cursor_values)).limit(page_size + 1).execute()
+    else:
+        offset = (page - 1) * page_size
+        res    = query.range(offset, offset + page_size).execute()
 
-def news_list(request):
-    res = (
-        get_supabase_client()
-        .table("news")
-        .select("*, profiles(username)")  
-        .order("created_at", desc=True)
-        .execute()
+    rows = res.data or []
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows        = rows[:page_size]
+        next_cursor = encode_cursor([rows[-1][column] for column in columns])
+
+    return rows, next_cursor
+
+def get_categories():
+    """All categories, cached; categories are only edited in the dashboard."""
+    return cached(
+        "categories", ["categories"], [], settings.NEWS_CACHE_TTLS["categories"],
+        lambda: get_supabase_client().table("categories").select("*").execute().data or [],
     )
-    
-    categories = get_supabase_client().table("categories").select("*").execute()
 
-    news = []
-    for item in res.data or []:
-        profile = item.pop("profiles", None)
-        item["author_username"] = profile["username"] if profile else "Unknown"
+def feed_page(filter_type, category=None, cursor_values=None, page=1):
+    """Cached ``fetch_news_page``; first pages of each category x filter are
+    the busiest keys and are prefilled by the warm_feed_cache command."""
+    return cached(
+        "news_api", ["feed"], [filter_type, page, cursor_values, category], settings.NEWS_CACHE_TTLS["api"],
+        lambda: fetch_news_page(filter_type, cursor_values=cursor_values, page=page, category=category),
+    )
 
-        for field in ("created_at", "updated_at"):
-            raw = item.get(field)
-            if raw:
-                item[field] = datetime.fromisoformat(raw)
+@conditional_view("news_list", ["feed", "categories", "profiles"], per_user=True, ttl=settings.NEWS_CACHE_TTLS["api"])
+def news_list(request):
+    filter_type = "hot"
 
-        news.append(item)
+    # Same cache entry as the first news_api page, which warm_feed_cache fills
+    news, next_cursor = feed_page(filter_type)
+    news = parse_supabase_data(news, "created_at")
+    attach_authors(news)
+    categories = get_categories()
 
-    print("🚀 DEBUG: News List", news)
     return render(request, "list.html", {
         "title":       "Web Game News",
         "description": "Browse the latest news posts.",
         "news":        news,
-        "categories": categories.data
+        "filter":      filter_type,
+        "next_cursor": next_cursor,
+        "categories": categories
     })
 
-def news_detail(request, pk):
-    client = get_supabase_client()
-
-    res = (
+def build_comment_tree(rows, max_depth=3):
+    """Nest a flat, already-ordered comment list into a ``max_depth`` tree.
+
+    Rows keep their query order (votes, created_at) within each level.
+    Returns the root comments and the number of comments in the tree;
+    replies below ``max_depth`` or under a missing parent are dropped.
+    """
+    by_id = {}
+    for row in rows:
+        row["replies"] = []
+
+        by_id[row["id"]] = parse_supabase_data(row, "created_at", "updated_at")
+
+    roots = []
+    for row in by_id.values():
+        parent_id = row.get("parent_id")
+        if not parent_id:
+            roots.append(row)
+        elif parent_id in by_id:
+            by_id[parent_id]["replies"].append(row)
+
+    count = 0
+    level = roots
+    for depth in range(1, max_depth + 1):
+        count += len(level)
+        if depth == max_depth:
+            for node in level:
+                node["replies"] = []
+            break
+        level = [reply for node in level for reply in node["replies"]]
+
+    return roots, count
+
+def news_detail_queries(client, pk):
+    """Post and comment queries for news_detail (sync or async client)."""
+    post_query = (
         client.table("news")
-        .select("*, profiles(username, avatar_url)")
+        .select("*")
         .eq("id", str(pk))
         .single()
-        .execute()
     )
 
-    if not res.data:
-        raise Http404("News not found")
-
-    item = res.data
-    profile = item.pop("profiles", None)
-
-    item["author_username"] = profile["username"] if profile else "Unknown"
-    item["author_avatar"] = profile.get("avatar_url") if profile else None
-    item = parse_supabase_data(item, "created_at", "updated_at")
-
-    def fetch_replies(parent_id, depth=1, max_depth=3):
-        if depth > max_depth:
-            return []
-
-        replies_res = (
-            client.table("comments")
-            .select("*, profiles(username, avatar_url)")
-            .eq("parent_id", parent_id)
-            .order("votes", desc=True)
-            .order("created_at", desc=True)
-            .execute()
-        )
-
-        replies = []
-        for reply in (replies_res.data or []):
-            r_profile = reply.pop("profiles", None)
-
-            reply["author_username"] = r_profile["username"] if r_profile else "Unknown"
-            reply["author_avatar"] = r_profile.get("avatar_url") if r_profile else None
-
-            reply = parse_supabase_data(reply, "created_at", "updated_at")
-
-            # recursively fetch deeper replies
-            reply["replies"] = fetch_replies(reply["id"], depth + 1, max_depth)
-
-            replies.append(reply)
-
-        return replies
-
-    comments_res = (
+    # One query for the whole thread; the tree is assembled in memory.
+    comments_query = (
         client.table("comments")
-        .select("*, profiles(username, avatar_url)")
+        .select("*")
         .eq("news_id", str(pk))
-        .is_("parent_id", "null")
         .order("votes", desc=True)
         .order("created_at", desc=True)
-        .execute()
     )
+    return post_query, comments_query
 
-    comments = []
-
-    for comment in (comments_res.data or []):
-        profile = comment.pop("profiles", None)
-
-        comment["author_username"] = profile["username"] if profile else "Unknown"
-        comment["author_avatar"] = profile.get("avatar_url") if profile else None
-
-        comment = parse_supabase_data(comment, "created_at", "updated_at")
-
-        comment["replies"] = fetch_replies(comment["id"], depth=2)
+def build_news_detail(item, comment_rows):
+    if not item:
+        raise Http404("News not found")
 
-        comments.append(comment)
+    item = parse_supabase_data(item, "created_at", "updated_at")
 
-    def count_comments(nodes):
-        total = 0
-        for n in nodes:
-            total += 1
-            total += count_comments(n.get("replies", []))
-        return total
+    comments, comments_count = build_comment_tree(comment_rows or [])
+    return item, comments, comments_count
+
+def with_detail_authors(item, comments):
+    """Attach authors to a post and every comment of its (cached) tree."""
+    rows  = [item]
+    level = comments
+    while level:
+        rows.extend(level)
+        level = [reply for node in level for reply in node["replies"]]
+    attach_authors(rows)
+
+def load_news_detail(pk):
+    post_query, comments_query = news_detail_queries(get_supabase_client(), pk)
+    return build_news_detail(post_query.execute().data, comments_query.execute().data)
+
+# The view count in the page changes without a "news:<pk>" bump, so the
+# validators roll over with the cached copy
+@counts_views
+@conditional_view(
+    "news_detail", lambda request, pk: [f"news:{pk}", "profiles"],
+    per_user=True, ttl=settings.NEWS_CACHE_TTLS["detail"],
+)
+def news_detail(request, pk):
+    item, comments, comments_count = cached(
+        "news_detail", [f"news:{pk}"], [str(pk)], settings.NEWS_CACHE_TTLS["detail"],
+        lambda: load_news_detail(pk),
+    )
+    with_detail_authors(item, comments)
 
     return render(
         request,
@@ -126,7 +263,7 @@ def news_detail(request, pk):
         {
             "item": item,
             "comments": comments,
-            "comments_count": count_comments(comments),
+            "comments_count": comments_count,
         },
     )
 
@@ -135,13 +272,14 @@ def news_create(request):
     if request.method == 'POST':
         form = NewsForm(request.POST)
         if form.is_valid():
-            user_id = request.session.get('supabase_user_id')
+            user_id = request.supabase_user.id
             
             get_supabase_client().table('news').insert({
                 'title': form.cleaned_data['title'],
-                'content': form.cleaned_data['content'],
                 'author_id': user_id,
+                **prepare_content(form.cleaned_data['content']),
             }).execute()
+            invalidate_feed()
             return redirect('news_list')
     else:
         form = NewsForm()
@@ -151,45 +289,72 @@ def news_create(request):
         'form': form
     })
 
+@conditional_view("news_api", ["feed", "categories", "profiles"], ttl=settings.NEWS_CACHE_TTLS["api"])
 def news_api(request):
-    VALID_FILTERS = {"new", "top", "hot", "best"}
     filter_type = request.GET.get("filter", "new")
-    page        = int(request.GET.get("page", 1))
-    page_size   = 10
+    cursor      = request.GET.get("cursor")
+    category    = request.GET.get("category") or None
 
-    if filter_type not in VALID_FILTERS:
-        return JsonResponse({"error": f"Invalid filter. Choose from: {', '.join(VALID_FILTERS)}"}, status=400)
+    if filter_type not in NEWS_SORTS:
+        return JsonResponse({"error": f"Invalid filter. Choose from: {', '.join(NEWS_SORTS)}"}, status=400)
 
-    offset = (page - 1) * page_size
-    client = get_supabase_client()
+    # Only known ids, so arbitrary values never reach the query or the cache
+    if category and category not in {str(c["id"]) for c in get_categories()}:
+        return JsonResponse({"error": "Invalid category"}, status=400)
 
-    count_query = client.table("news").select("*", count="exact", head=True)
-    count_res   = count_query.execute()
-    total       = count_res.count or 0
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        return JsonResponse({"error": "Invalid page"}, status=400)
+    if page < 1:
+        return JsonResponse({"error": "Invalid page"}, status=400)
+
+    values = None
+    if cursor:
+        try:
+            values = parse_cursor(filter_type, cursor)
+        except ValueError:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
 
-    query = client.table("news").select("*, profiles(username)")
+    news, next_cursor = feed_page(filter_type, category=category, cursor_values=values, page=page)
+    attach_authors(news)
 
-    if filter_type == "new":
-        query = query.order("created_at", desc=True)
-    elif filter_type == "top":
-        query = query.order("votes", desc=True)
-    elif filter_type == "hot":
-        query = query.order("views", desc=True)
-    elif filter_type == "best":
-        query = query.order("votes", desc=True).order("views", desc=True)
+    return JsonResponse({
+        "news":        news,
+        "category":    category,
+        "page":        page,
+        "has_more":    next_cursor is not None,
+        "next_cursor": next_cursor,
+    })
 
-    res = query.range(offset, offset + page_size - 1).execute()
+@conditional_view("news_search", ["feed"], ttl=settings.NEWS_CACHE_TTLS["search"])
+def news_search(request):
+    query = " ".join((request.GET.get("q") or "").split())
 
-    news = []
-    for item in (res.data or []):
-        profile = item.pop("profiles", None)
-        item["author_username"] = profile["username"] if profile else "Unknown"
-        news.append(item)
+    if not query:
+        return JsonResponse({"error": "Query is required"}, status=400)
+    if len(query) > settings.SEARCH_MAX_QUERY:
+        return JsonResponse({"error": "Query is too long"}, status=400)
+
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        return JsonResponse({"error": "Invalid page"}, status=400)
+    if not 1 <= page <= settings.SEARCH_MAX_PAGE:
+        return JsonResponse({"error": "Invalid page"}, status=400)
+
+    # One extra row tells whether another page exists
+    offset  = (page - 1) * NEWS_PAGE_SIZE
+    results = cached(
+        "news_search", ["feed"], [query.lower(), page], settings.NEWS_CACHE_TTLS["search"],
+        lambda: get_search_backend().search(query, NEWS_PAGE_SIZE + 1, offset),
+    )
 
     return JsonResponse({
-        "news":     news,
+        "query":    query,
+        "results":  results[:NEWS_PAGE_SIZE],
         "page":     page,
-        "has_more": (offset + page_size) < total,
+        "has_more": len(results) > NEWS_PAGE_SIZE,
     })
 
 @supabase_auth_required
@@ -200,8 +365,12 @@ def news_api_create(request):
     title       = (request.POST.get("title") or "").strip()
     category_id = request.POST.get("category_id")
     content     = (request.POST.get("content") or "").strip()
-    image       = request.FILES.get("image")
-    user_id     = request.session.get("supabase_user_id")
+    user_id     = request.supabase_user.id
+
+    try:
+        image = get_upload(request, "image")
+    except UploadTooLarge as e:
+        return JsonResponse({"error": str(e)}, status=413)
 
     if not user_id:
         return JsonResponse({"error": "Unauthorized"}, status=401)
@@ -213,27 +382,24 @@ def news_api_create(request):
 
     supabase = get_supabase_client()
 
-    image_url = None
+    image_url        = None
+    image_renditions = None
     if image:
-        file_ext  = image.name.rsplit(".", 1)[-1].lower()
-        file_name = f"{uuid.uuid4()}.{file_ext}"
         try:
-            supabase.storage.from_("news_bucket").upload(
-                file_name,
-                image.read(),
-                {"content-type": image.content_type},
-            )
-            image_url = supabase.storage.from_("news_bucket").get_public_url(file_name)
+            image_url, image_renditions = upload_image(image, "news")
+        except ImageProcessingError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             return JsonResponse({"error": f"Image upload failed: {str(e)}"}, status=500)
 
     try:
         result = supabase.table("news").insert({
             "title":     title,
-            "content":   content,
             "author_id": user_id,
+            **prepare_content(content),
             "category_id": category_id,
             "image_url": image_url,
+            "image_renditions": image_renditions,
         }).execute()
     except Exception as e:
         return JsonResponse({"error": f"Database insert failed: {str(e)}"}, status=500)
@@ -241,17 +407,24 @@ def news_api_create(request):
     if not result.data:
         return JsonResponse({"error": "Insert returned no data"}, status=500)
 
+    invalidate_feed()
     return JsonResponse({"success": True, "message": "News created successfully"})
 
 @supabase_auth_required
 def news_update(request, pk):
-    user_id      = request.session.get("supabase_user_id")
+    user_id      = request.supabase_user.id
     client       = get_supabase_client()
 
     res  = client.table("news").select("*").eq("id", str(pk)).single().execute()
     news = res.data
     categories = client.table("categories").select("*").execute()
 
+    return news_update_response(request, pk, user_id, news, categories)
+
+def news_update_response(request, pk, user_id, news, categories):
+    """Everything in news_update after the post and categories are loaded."""
+    client = get_supabase_client()
+
     if not news:
         return JsonResponse({"error": "Not found"}, status=404)
 
@@ -273,6 +446,11 @@ def news_update(request, pk):
     if request.method == "POST":
         form = NewsForm(request.POST, request.FILES)
 
+        try:
+            get_upload(request, "image")
+        except UploadTooLarge as e:
+            form.add_error("image", str(e))
+
         if not form.is_valid():
             return render(request, "form.html", {
                 "form": form,
@@ -285,22 +463,17 @@ def news_update(request, pk):
         content = form.cleaned_data["content"]
         image   = form.cleaned_data.get("image")
 
-        image_url    = news.get("image_url")   
-        remove_image = request.POST.get("remove_image") == "true"
+        image_url        = news.get("image_url")   
+        image_renditions = news.get("image_renditions")
+        remove_image     = request.POST.get("remove_image") == "true"
 
         if remove_image:
-            image_url = None
+            image_url        = None
+            image_renditions = None
 
         elif image:
-            file_ext  = image.name.rsplit(".", 1)[-1].lower()
-            file_name = f"{uuid.uuid4()}.{file_ext}"
             try:
-                client.storage.from_("news_bucket").upload(
-                    file_name,
-                    image.read(),
-                    {"content-type": image.content_type},
-                )
-                image_url = client.storage.from_("news_bucket").get_public_url(file_name)
+                image_url, image_renditions = upload_image(image, "news")
             except Exception as e:
                 form.add_error(None, f"Image upload failed: {str(e)}")
                 return render(request, "form.html", {
@@ -314,8 +487,9 @@ def news_update(request, pk):
                 client.table("news")
                 .update({
                     "title":     title,
-                    "content":   content,
                     "image_url": image_url,
+                    **prepare_content(content),
+                    "image_renditions": image_renditions,
                 })
                 .eq("id", str(pk))
                 .execute()
@@ -336,6 +510,9 @@ def news_update(request, pk):
                 "title": "Edit Post",
             })
 
+        invalidate_news(pk)
+        if image_renditions != news.get("image_renditions"):
+            delete_image(news.get("image_renditions"))
         return render(request, "news/list.html", {
             "categories": categories.data
         })
@@ -347,6 +524,7 @@ def news_update(request, pk):
 def news_delete(request, pk):
     if request.method == "POST":
         get_supabase_client().table("news").delete().eq("id", str(pk)).execute()
+        invalidate_news(pk)
     return redirect("news_list")
 
 
@@ -355,7 +533,7 @@ def news_vote(request, pk):
     if request.method != "POST":
         return JsonResponse({"error": "Method not allowed"}, status=405)
 
-    user_id = request.session.get("supabase_user_id")
+    user_id = request.supabase_user.id
     client  = get_supabase_client()
 
     import json
@@ -365,8 +543,8 @@ def news_vote(request, pk):
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid request body"}, status=400)
 
-    if value not in (1, -1):
-        return JsonResponse({"error": "Value must be 1 or -1"}, status=400)
+    if value not in VOTE_VALUES:
+        return JsonResponse({"error": "Value must be 1, -1 or 0"}, status=400)
 
     try:
         result = client.rpc("handle_vote", {
@@ -380,6 +558,8 @@ def news_vote(request, pk):
     except Exception as e:
         return JsonResponse({"error": f"Vote failed: {str(e)}"}, status=500)
 
+    invalidate_votes(pk)
+
     return JsonResponse({"success": True, "votes": new_votes})
 
 
@@ -388,7 +568,7 @@ def comment_create(request, pk):
     if request.method != "POST":
         return JsonResponse({"error": "Method not allowed"}, status=405)
 
-    user_id = request.session.get("supabase_user_id")
+    user_id = request.supabase_user.id
     client = get_supabase_client()
 
     content = (request.POST.get("content") or "").strip()
@@ -431,6 +611,7 @@ def comment_create(request, pk):
     if not result.data:
         return JsonResponse({"error": "Comment creation failed"}, status=500)
 
+    invalidate_comments(pk)
     return redirect("news_detail", pk=pk)
 
 
@@ -439,7 +620,7 @@ def comment_vote(request, comment_id):
     if request.method != "POST":
         return JsonResponse({"error": "Method not allowed"}, status=405)
     
-    user_id = request.session.get("supabase_user_id")
+    user_id = request.supabase_user.id
     client  = get_supabase_client()
     
     import json
@@ -449,8 +630,8 @@ def comment_vote(request, comment_id):
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid request body"}, status=400)
     
-    if value not in (1, -1):
-        return JsonResponse({"error": "Value must be 1 or -1"}, status=400)
+    if value not in VOTE_VALUES:
+        return JsonResponse({"error": "Value must be 1, -1 or 0"}, status=400)
     
     try:
         result = client.rpc("handle_comment_vote", {
@@ -462,5 +643,98 @@ def comment_vote(request, comment_id):
         new_votes = result.data.get("votes")
     except Exception as e:
         return JsonResponse({"error": f"Vote failed: {str(e)}"}, status=500)
-    
-    return JsonResponse({"success": True, "votes": new_votes})
\ No newline at end of file
+
+    comment = client.table("comments").select("news_id").eq("id", str(comment_id)).execute()
+    if comment.data:
+        invalidate_comments(comment.data[0]["news_id"])
+
+    return JsonResponse({"success": True, "votes": new_votes})
+
+
+VOTE_TARGETS     = ("news", "comment")
+VOTE_BATCH_LIMIT = 50
+
+def _validate_vote(vote):
+    if not isinstance(vote, dict):
+        return "Vote must be an object"
+    if vote.get("target") not in VOTE_TARGETS:
+        return f"Target must be one of: {', '.join(VOTE_TARGETS)}"
+    try:
+        uuid.UUID(str(vote.get("id")))
+    except ValueError:
+        return "Invalid id"
+    if vote.get("value") not in VOTE_VALUES:
+        return "Value must be 1, -1 or 0"
+    key = vote.get("key")
+    if not isinstance(key, str) or not key or len(key) > 100:
+        return "Idempotency key is required"
+    return None
+
+@supabase_auth_required
+def votes_batch(request):
+    """Apply many news/comment votes in one ``handle_votes_batch`` RPC.
+
+    Body: ``{"votes": [{"target", "id", "value", "key"}, ...]}``. ``key``
+    is generated by the client and reused on retries; the RPC skips keys
+    it has already applied. Repeated votes on the same target within a
+    batch are coalesced to the last one.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+
+    user_id = request.supabase_user.id
+    client  = get_supabase_client()
+
+    import json
+    try:
+        votes = json.loads(request.body).get("votes")
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({"error": "Invalid request body"}, status=400)
+
+    if not isinstance(votes, list) or not votes:
+        return JsonResponse({"error": "votes must be a non-empty list"}, status=400)
+    if len(votes) > VOTE_BATCH_LIMIT:
+        return JsonResponse({"error": f"At most {VOTE_BATCH_LIMIT} votes per batch"}, status=400)
+
+    results   = []
+    coalesced = {}
+    for vote in votes:
+        error = _validate_vote(vote)
+        if error:
+            results.append({"key": vote.get("key") if isinstance(vote, dict) else None, "error": error})
+            continue
+        coalesced[(vote["target"], str(vote["id"]))] = {
+            "target": vote["target"],
+            "id":     str(vote["id"]),
+            "value":  vote["value"],
+            "key":    vote["key"],
+        }
+
+    if coalesced:
+        try:
+            result = client.rpc("handle_votes_batch", {
+                "p_user_id": user_id,
+                "p_votes":   list(coalesced.values()),
+            }).execute()
+        except Exception as e:
+            return JsonResponse({"error": f"Vote failed: {str(e)}"}, status=500)
+
+        results.extend(result.data or [])
+
+        for news_id in {v["id"] for v in coalesced.values() if v["target"] == "news"}:
+            invalidate_votes(news_id)
+
+        comment_ids = [v["id"] for v in coalesced.values() if v["target"] == "comment"]
+        if comment_ids:
+            comments = client.table("comments").select("news_id").in_("id", comment_ids).execute()
+            for news_id in {c["news_id"] for c in (comments.data or [])}:
+                invalidate_comments(news_id)
+
+    return JsonResponse({"success": True, "results": results})
+
+
+def news_cache_stats(request):
+    token = settings.CACHE_STATS_TOKEN
+    if not (settings.DEBUG or (token and request.headers.get("X-Cache-Stats-Token") == token)):
+        raise Http404
+    return JsonResponse(cache_stats(CACHED_VIEWS))
\ No newline at end of file